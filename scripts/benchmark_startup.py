@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+AGI Sentinel Startup Benchmark
+Measures cold-start cost in fresh interpreters: import time, construction
+time, first-scan latency (which pays for lazy rule compilation and log setup),
+steady-state scan latency and the cold total (import through first scan).
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter per sample so nothing is cached between runs
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+t1 = time.perf_counter()
+from src.agi_sentinel.core import AGISentinelCore
+sentinel = AGISentinelCore(log_dir={log_dir!r})
+t2 = time.perf_counter()
+sentinel.scan_text("Contact test@example.com, card 4111111111111111")
+t3 = time.perf_counter()
+for _ in range({warm_scans}):
+    sentinel.scan_text("Contact test@example.com, card 4111111111111111")
+t4 = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (t1 - t0) * 1000,
+    "construct_ms": (t2 - t1) * 1000,
+    "first_scan_ms": (t3 - t2) * 1000,
+    "warm_scan_ms": (t4 - t3) * 1000 / max(1, {warm_scans}),
+    "cold_total_ms": (t3 - t0) * 1000,
+}}))
+"""
+
+def run_sample(module: str, log_dir: Optional[str], warm_scans: int) -> dict:
+    code = CHILD.format(module=module, log_dir=log_dir, warm_scans=warm_scans)
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        check=True
+    )
+    # Last line is the measurement; anything before it is module output
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def benchmark(module: str = "src.agi_sentinel.core", runs: int = 10, warm_scans: int = 100,
+              audit_log: bool = True) -> dict:
+    """Median and min of each metric over `runs` fresh interpreters"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        samples = [run_sample(module, log_dir if audit_log else None, warm_scans) for _ in range(runs)]
+
+    return {
+        metric: {
+            "median": round(statistics.median(s[metric] for s in samples), 3),
+            "min": round(min(s[metric] for s in samples), 3)
+        }
+        for metric in samples[0]
+    }
+
+def main():
+    """Command line interface for the startup benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="AGI Sentinel startup benchmark",
+        epilog="Example: python scripts/benchmark_startup.py --runs 20"
+    )
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per module (default: 10)")
+    parser.add_argument("--warm-scans", type=int, default=100, help="Scans averaged for steady-state latency")
+    parser.add_argument("--no-audit-log", action="store_true",
+                        help="Construct with log_dir=None (console logging only)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {
+        module: benchmark(module, args.runs, args.warm_scans, audit_log=not args.no_audit_log)
+        for module in ("src.agi_sentinel.core", "src.agi_sentinel.cli")
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for module, metrics in results.items():
+        print(f"\n[*] import {module} ({args.runs} runs)")
+        for metric, value in metrics.items():
+            print(f"    {metric:15s} median {value['median']:9.3f} ms   min {value['min']:9.3f} ms")
+
+if __name__ == "__main__":
+    main()
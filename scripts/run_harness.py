@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+AGI Sentinel Equivalence Harness
+Runs the reference engine and the candidate engines over generated and/or
+recorded corpora, diffs their output and checks speed budgets. Exits with
+status 1 when any scenario fails, so it can gate engine changes in CI.
+
+Relative slowdown budgets cannot see a regression in scan_text itself, so
+keep a report from a known-good build and pass it with --baseline.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Runnable as "python scripts/run_harness.py" from anywhere
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.agi_sentinel.harness import (
+    DEFAULT_CORPUS_SIZE, DEFAULT_MAX_DIFFS, DEFAULT_MAX_REGRESSION, DEFAULT_SEED,
+    default_scenarios, generate_corpus, load_baseline, load_corpus, run_harness, save_corpus
+)
+
+def print_report(report: dict):
+    print("\n" + "=" * 60)
+    print("EQUIVALENCE HARNESS")
+    print("=" * 60)
+    reference = report["reference"]
+    print(f"Corpus: {report['corpus_size']} texts")
+    mark = "✅" if reference["status"] == "PASSED" else "❌"
+    print(f"{mark} Reference: {reference['throughput']}/s, p95 {reference['p95_ms']} ms")
+    for violation in reference["budget_violations"]:
+        print(f"   Budget: {violation}")
+    if report["baseline"]:
+        print(f"Baseline: {report['baseline']['timestamp']} "
+              f"({report['baseline']['corpus_size']} texts, max regression {report['baseline']['max_regression']}x)")
+
+    for scenario in report["scenarios"]:
+        mark = "✅" if scenario["status"] == "PASSED" else "❌"
+        print(f"\n{mark} {scenario['name']:10s} {scenario['notes']}")
+        if "error" in scenario:
+            print(f"   Error: {scenario['error']}")
+            continue
+        print(f"   Texts: {scenario['texts']}, mismatches: {scenario['mismatches']}")
+        print(f"   Slowdown: {scenario['slowdown']}x, throughput: {scenario['throughput']}/s"
+              + (f", p95 {scenario['p95_ms']} ms" if scenario['p95_ms'] is not None else ""))
+        for violation in scenario["budget_violations"]:
+            print(f"   Budget: {violation}")
+        for diff in scenario["diffs"]:
+            print(f"   Diff #{diff['index']} {diff['fields']}: {diff['text'][:60]!r}")
+            for key in diff["fields"]:
+                print(f"      expected {key}: {str(diff['expected'][key])[:100]}")
+                print(f"      actual   {key}: {str(diff['actual'][key])[:100]}")
+
+    print("\n" + "=" * 60)
+    print(f"RESULT: {report['status']}")
+    print("=" * 60)
+
+def main():
+    """Command line interface for the harness"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="AGI Sentinel differential equivalence and performance harness",
+        epilog="Example: python scripts/run_harness.py --size 5000 --baseline harness_baseline.json"
+    )
+    parser.add_argument("--size", type=int, default=DEFAULT_CORPUS_SIZE, help="Generated corpus size")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Generated corpus seed")
+    parser.add_argument("--corpus", nargs="+", default=[], help="Recorded corpora (.jsonl or one text per line)")
+    parser.add_argument("--no-generated", action="store_true", help="Use recorded corpora only")
+    parser.add_argument("--save-corpus", help="Record the generated corpus as JSON Lines")
+    parser.add_argument("--scenarios", nargs="+", help="Scenarios to run (default: all)")
+    parser.add_argument("--max-slowdown", type=float, help="Override every scenario's slowdown budget")
+    parser.add_argument("--min-throughput", type=float, help="Minimum texts/second for the reference and every scenario")
+    parser.add_argument("--max-p95-ms", type=float, help="Maximum p95 latency (ms) where measured")
+    parser.add_argument("--baseline", help="Earlier --json report; fail when throughput regressed")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help=f"Allowed baseline/current throughput ratio (default: {DEFAULT_MAX_REGRESSION})")
+    parser.add_argument("--max-diffs", type=int, default=DEFAULT_MAX_DIFFS, help="Example diffs shown per scenario")
+    parser.add_argument("--json", help="Write the full report to a JSON file")
+    args = parser.parse_args()
+
+    corpus = []
+    if not args.no_generated:
+        generated = generate_corpus(args.size, args.seed)
+        if args.save_corpus:
+            save_corpus(generated, args.save_corpus)
+            print(f"[+] Generated corpus saved to: {args.save_corpus}")
+        corpus.extend(generated)
+    for path in args.corpus:
+        corpus.extend(load_corpus(path))
+    if not corpus:
+        print("[ERROR] Empty corpus", file=sys.stderr)
+        sys.exit(2)
+
+    scenarios = default_scenarios()
+    if args.scenarios:
+        unknown = set(args.scenarios) - {s.name for s in scenarios}
+        if unknown:
+            print(f"[ERROR] Unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+            sys.exit(2)
+        scenarios = [s for s in scenarios if s.name in args.scenarios]
+    for scenario in scenarios:
+        if args.max_slowdown is not None:
+            scenario.max_slowdown = args.max_slowdown
+        if args.min_throughput is not None:
+            scenario.min_throughput = args.min_throughput
+        if args.max_p95_ms is not None:
+            scenario.max_p95_ms = args.max_p95_ms
+
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = load_baseline(args.baseline)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Cannot load baseline: {e}", file=sys.stderr)
+            sys.exit(2)
+        if baseline.get("corpus_size") != len(corpus):
+            print(f"[!] Baseline corpus had {baseline.get('corpus_size')} texts, this run has {len(corpus)}")
+
+    report = run_harness(
+        corpus, scenarios,
+        max_diffs=args.max_diffs,
+        min_throughput=args.min_throughput,
+        max_p95_ms=args.max_p95_ms,
+        baseline=baseline,
+        max_regression=args.max_regression
+    )
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"[+] Report written to: {args.json}")
+
+    sys.exit(0 if report["status"] == "PASSED" else 1)
+
+if __name__ == "__main__":
+    main()
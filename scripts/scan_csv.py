@@ -2,20 +2,24 @@
 """
 AGI Sentinel CSV Scanner - Enhanced
 Professional CSV scanning with proper error handling
+Rows are streamed through the reader -> scanner -> writer pipeline, so memory
+stays bounded whatever the file size.
 """
 
+import csv
 import sys
-import pandas as pd
 from pathlib import Path
 
 # Correct import (FIXED from original error)
 from src.agi_sentinel.core import AGISentinel
+from src.agi_sentinel.pipeline import Pipeline, CsvSink, csv_source
 
 def scan_csv(
     file_path: str,
     col_names: list = None,
     output_suffix: str = "_shielded",
-    verbose: bool = False
+    verbose: bool = False,
+    workers: int = 4
 ):
     """
     Scan CSV file with professional error handling
@@ -25,6 +29,7 @@ def scan_csv(
         col_names: List of column names to scan (None for all)
         output_suffix: Suffix for output file
         verbose: Print detailed progress
+        workers: Parallel scanner workers
     
     Returns:
         Path to output file or None if failed
@@ -47,18 +52,23 @@ def scan_csv(
         if verbose:
             print(f"[*] Loading {file_path}...")
         
-        # Read CSV
-        df = pd.read_csv(file_path)
+        # Read header only - rows are streamed
+        with open(file_path, "r", encoding="utf-8", errors="replace", newline="") as f:
+            header = next(csv.reader(f), None)
+        
+        if header is None:
+            print(f"[ERROR] CSV file is empty: {file_path}", file=sys.stderr)
+            return None
         
         if verbose:
-            print(f"[*] Loaded {len(df)} rows, {len(df.columns)} columns")
+            print(f"[*] Found {len(header)} columns")
         
         # Determine columns to scan
         if col_names is None:
-            col_names = df.columns.tolist()
+            col_names = list(header)
         
         # Validate columns exist
-        missing_cols = [col for col in col_names if col not in df.columns]
+        missing_cols = [col for col in col_names if col not in header]
         if missing_cols:
             print(f"[ERROR] Columns not found: {', '.join(missing_cols)}", file=sys.stderr)
             return None
@@ -66,39 +76,41 @@ def scan_csv(
         if verbose:
             print(f"[*] Scanning columns: {', '.join(col_names)}")
         
-        # Scan each column
-        for col in col_names:
-            if verbose:
-                print(f"[*] Processing column: {col}")
-            
-            # Apply protection
-            df[f'{col}_shielded'] = df[col].astype(str).apply(
-                lambda x: guard.protect(x)['output']
-            )
+        def shield_row(row):
+            """Add a <col>_shielded value for every scanned column"""
+            incidents = 0
+            for col in col_names:
+                result = guard.scan_text(row[col] or "")
+                row[f'{col}_shielded'] = result.processed_text
+                incidents += len(result.incidents)
+            return row, incidents
         
         # Generate output filename
         output_file = file_path.parent / f"{file_path.stem}{output_suffix}{file_path.suffix}"
         
-        # Save results
-        df.to_csv(output_file, index=False)
+        # Stream rows through the pipeline
+        result = Pipeline(
+            csv_source(str(file_path)),
+            shield_row,
+            CsvSink(str(output_file), fieldnames=header + [f'{col}_shielded' for col in col_names]),
+            workers=workers
+        ).run()
+        
+        if result["status"] != "COMPLETED":
+            print(f"[ERROR] Scan failed: {result.get('error')}", file=sys.stderr)
+            return None
         
         if verbose:
             print(f"[+] Scan complete! Results saved to: {output_file}")
-            print(f"[+] Original columns: {len(df.columns) - len(col_names)}")
+            print(f"[+] Rows processed: {result['records']} ({result['records_per_second']}/s)")
+            print(f"[+] Original columns: {len(header)}")
             print(f"[+] New shielded columns: {len(col_names)}")
         
         return output_file
     
-    except pd.errors.EmptyDataError:
-        print(f"[ERROR] CSV file is empty: {file_path}", file=sys.stderr)
-        return None
-    except pd.errors.ParserError as e:
+    except csv.Error as e:
         print(f"[ERROR] Failed to parse CSV: {e}", file=sys.stderr)
         return None
-    except MemoryError:
-        print(f"[ERROR] File too large for memory: {file_path}", file=sys.stderr)
-        print("[TIP] Use the main CLI with --chunk-size for large files", file=sys.stderr)
-        return None
     except Exception as e:
         print(f"[ERROR] Unexpected error: {e}", file=sys.stderr)
         return None
@@ -130,6 +142,13 @@ def main():
         default=None
     )
     
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        help="Parallel scanner workers (default: 4)",
+        default=4
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -139,12 +158,12 @@ def main():
     args = parser.parse_args()
     
     # Execute scan
-
-result = scan_csv(
+    result = scan_csv(
         file_path=args.csv_file,
         col_names=args.cols,
-        output_suffix="",
-        verbose=args.verbose
+        output_suffix="_shielded",
+        verbose=args.verbose,
+        workers=args.workers
     )
     
     if result:
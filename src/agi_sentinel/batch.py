@@ -0,0 +1,255 @@
+"""
+AGI Sentinel Batch Mode - Checkpointed, resumable CSV scanning
+The input is processed in fixed-size chunks. After every chunk the output is
+flushed to disk and a manifest records the chunks done, the output size and
+cumulative stats, so an interrupted job can resume from the last checkpoint
+and produce output identical to an uninterrupted run.
+
+When no columns are given, a cheap first pass profiles every chunk (no
+scanning) to fix the output layout: the columns that any chunk can hold
+findings in, the same set the non-batch path scans. Each chunk is then
+profiled again within that set, so a column whose sensitive values only show
+up in later chunks is still scanned there.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+MANIFEST_FORMAT_VERSION = 2
+DEFAULT_CHUNK_SIZE = 10000
+
+class CheckpointManifest:
+    """JSON manifest describing the progress of one batch job"""
+
+    def __init__(self, path: str, data: Optional[Dict] = None):
+        self.path = path
+        self.data = data or {}
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CheckpointManifest"]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[!] Ignoring unreadable checkpoint {path}: {e}")
+            return None
+        if data.get("format") != MANIFEST_FORMAT_VERSION:
+            return None
+        return cls(path, data)
+
+    def save(self):
+        """Write the manifest atomically (write temp file, fsync, rename)"""
+        self.data["updated_at"] = datetime.now().isoformat()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def matches(self, job: Dict) -> bool:
+        """True when the manifest was written for the same input, rules and layout"""
+        keys = ("input_file", "input_size", "input_mtime_ns", "rules_version",
+                "chunk_size", "requested_columns", "output_mode", "column_rules",
+                "output_file")
+        return all(self.data.get(key) == job.get(key) for key in keys)
+
+def _job_identity(sentinel, file_path: str, output_file: str,
+                  columns: Optional[List[str]], chunk_size: int,
+                  output_mode: str, column_rules: Optional[Dict[str, List[str]]]) -> Dict:
+    stat = os.stat(file_path)
+    return {
+        "format": MANIFEST_FORMAT_VERSION,
+        "input_file": os.path.abspath(file_path),
+        "input_size": stat.st_size,
+        "input_mtime_ns": stat.st_mtime_ns,
+        "output_file": os.path.abspath(output_file),
+        "rules_version": sentinel.rules_version,
+        "chunk_size": chunk_size,
+        "requested_columns": columns,
+        "output_mode": output_mode,
+        "column_rules": column_rules,
+    }
+
+def _profile_pass(file_path: str, chunk_size: int, numeric_rules: List[str],
+                  column_rules: Optional[Dict[str, List[str]]]):
+    """
+    Profile every chunk without scanning
+
+    Returns:
+        (candidate columns in file order, {column: reason} for the rest)
+    """
+    import pandas as pd
+    from .schema import select_columns
+
+    header: List[str] = []
+    flagged = set()
+    reasons: Dict[str, str] = {}
+    for df in pd.read_csv(file_path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+        header = header or list(df.columns)
+        selected, skipped, _ = select_columns(
+            df, None, numeric_rules=numeric_rules, column_rules=column_rules
+        )
+        flagged.update(selected)
+        reasons.update(skipped)
+    candidates = [col for col in header if col in flagged]
+    return candidates, {col: reasons[col] for col in header if col not in flagged}
+
+def _summary(manifest: CheckpointManifest, resumed_from: int) -> Dict:
+    data = manifest.data
+    return {
+        "status": "COMPLETED",
+        "output_file": data["output_file"],
+        "input_file": data["input_file"],
+        "rows_processed": data["rows_processed"],
+        "columns_shielded": [col for col in data["columns"] if data["profile"][col]["scanned"]],
+        "columns_skipped": {col: info["reason"] for col, info in data["profile"].items() if info["reason"]},
+        "output_mode": data["output_mode"],
+        "total_incidents": data["total_incidents"],
+        "by_rule": data["by_rule"],
+        "chunks_processed": data["chunks_done"],
+        "resumed_from_chunk": resumed_from,
+        "checkpoint_file": manifest.path,
+        "timestamp": datetime.now().isoformat()
+    }
+
+def scan_csv_checkpointed(
+    sentinel,
+    file_path: str,
+    columns: Optional[List[str]] = None,
+    output_file: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = False,
+    output_mode: str = "append",
+    column_rules: Optional[Dict[str, List[str]]] = None
+) -> Dict:
+    """
+    Scan a CSV file chunk by chunk with a checkpoint after every chunk
+
+    Args:
+        sentinel: AGISentinelCore used for scanning
+        file_path: Input CSV file
+        columns: Columns to scan (None to profile every chunk and pick)
+        output_file: Final output path (default: shielded_<name> in the cwd)
+        chunk_size: Rows per chunk / checkpoint
+        checkpoint_path: Manifest path (default: <output_file>.checkpoint.json)
+        resume: Continue from an existing matching checkpoint
+        output_mode: "append", "inplace" or "changed" (see scan_file); in
+            batch mode "changed" keeps every scanned column so all chunks
+            share one layout
+        column_rules: Optional {column: [rule IDs]} subset per column
+
+    Returns:
+        Summary dictionary in the same shape as scan_file()
+    """
+    import pandas as pd
+    from .schema import build_output_frame, numeric_safe_rules, select_columns
+
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    output_file = output_file or f"shielded_{os.path.basename(file_path)}"
+    checkpoint_path = checkpoint_path or f"{output_file}.checkpoint.json"
+    part_file = f"{output_file}.part"
+
+    job = _job_identity(sentinel, file_path, output_file, columns, chunk_size,
+                        output_mode, column_rules)
+    numeric_rules = numeric_safe_rules(sentinel.rule_manager.compiled_patterns)
+
+    manifest = CheckpointManifest.load(checkpoint_path) if resume else None
+    if manifest is not None and not manifest.matches(job):
+        return {
+            "status": "ERROR",
+            "error": f"Checkpoint {checkpoint_path} does not match this input/rules/options; "
+                     f"rerun without --resume to start over",
+            "timestamp": datetime.now().isoformat()
+        }
+
+    if manifest is not None and manifest.data.get("completed"):
+        return _summary(manifest, manifest.data["chunks_done"])
+
+    if manifest is None or not os.path.exists(part_file):
+        # The layout (scannable columns) is fixed before the first chunk is written
+        if columns is None:
+            layout, not_scannable = _profile_pass(file_path, chunk_size, numeric_rules, column_rules)
+        else:
+            header = list(pd.read_csv(file_path, nrows=0, dtype=str).columns)
+            layout, not_scannable = [col for col in columns if col in header], {}
+        profile = {col: {"scanned": False, "rules": [], "reason": ""} for col in layout}
+        for col, reason in not_scannable.items():
+            profile[col] = {"scanned": False, "rules": [], "reason": reason}
+
+        manifest = CheckpointManifest(checkpoint_path, {
+            **job,
+            "columns": layout,
+            "profile": profile,
+            "chunks_done": 0,
+            "rows_processed": 0,
+            "output_bytes": 0,
+            "total_incidents": 0,
+            "by_rule": {},
+            "completed": False,
+        })
+        open(part_file, "wb").close()
+        manifest.save()
+
+    data = manifest.data
+    resumed_from = data["chunks_done"]
+
+    # Drop anything written after the last checkpoint
+    with open(part_file, "r+b") as f:
+        f.truncate(data["output_bytes"])
+
+    reader = pd.read_csv(file_path, chunksize=chunk_size, dtype=str, keep_default_na=False)
+
+    with open(part_file, "a", encoding="utf-8", newline="") as out:
+        for chunk_index, df in enumerate(reader):
+            if chunk_index < data["chunks_done"]:
+                continue
+
+            # Which layout columns get scanned (and with which rules) is decided per chunk
+            selected, skipped, rules = select_columns(
+                df, columns, numeric_rules=numeric_rules, column_rules=column_rules
+            )
+
+            shielded = {}
+            chunk_by_rule: Dict[str, int] = {}
+            for col in data["columns"]:
+                info = data["profile"][col]
+                if col not in selected:
+                    shielded[col] = list(df[col])
+                    if not info["scanned"]:
+                        info["reason"] = skipped.get(col, "not scanned")
+                    continue
+
+                shielded[col], col_by_rule = sentinel.shield_values(df[col], rules=rules.get(col))
+                for rule_id, count in col_by_rule.items():
+                    chunk_by_rule[rule_id] = chunk_by_rule.get(rule_id, 0) + count
+
+                # Remember the widest rule set any chunk used (None = all rules)
+                if info["rules"] is not None:
+                    info["rules"] = None if col not in rules else sorted(set(info["rules"]) | set(rules[col]))
+                info["reason"] = skipped.get(col, "") if info["rules"] is not None else ""
+                info["scanned"] = True
+
+            frame = build_output_frame(df, shielded, output_mode, drop_unchanged=False)
+            frame.to_csv(out, header=(chunk_index == 0), index=False)
+            out.flush()
+            os.fsync(out.fileno())
+
+            data["chunks_done"] = chunk_index + 1
+            data["rows_processed"] += len(df)
+            data["output_bytes"] = os.fstat(out.fileno()).st_size
+            data["total_incidents"] += sum(chunk_by_rule.values())
+            for rule_id, count in chunk_by_rule.items():
+                data["by_rule"][rule_id] = data["by_rule"].get(rule_id, 0) + count
+            manifest.save()
+
+    os.replace(part_file, output_file)
+    data["completed"] = True
+    manifest.save()
+
+    return _summary(manifest, resumed_from)
@@ -0,0 +1,179 @@
+"""
+AGI Sentinel Bytes Engine - Memory-mapped scanning for large files
+Rule patterns are compiled as bytes regexes and run directly over an mmap of
+the input, so multi-GB logs are never decoded into Python strings. Redacted
+output is produced by copying untouched byte ranges straight through.
+
+Notes:
+    - In bytes mode \\b, \\d and \\w are ASCII-only, which is what the built-in
+      rules expect. Rules whose pattern is not pure ASCII are skipped.
+    - Rules backed by the entropy secret detector run their provider
+      pattern only; generic high-entropy tokens are not reported in bytes mode.
+    - Overlapping findings are resolved as in scan_text: leftmost first, then
+      longest, then rule order; a match inside a redacted range is dropped.
+    - Replacements come from each rule's precomputed redactor (FULL markers
+      are encoded once; PARTIAL / TOKENIZE see the match decoded as UTF-8).
+"""
+
+import heapq
+import mmap
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+from .redaction import build_redactor
+
+# Copy untouched ranges in bounded slices to keep peak memory flat
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+class BytesRule:
+    """A single rule compiled for bytes-mode scanning"""
+    __slots__ = ("rule_id", "config", "regex", "redactor", "replacement", "order", "validators")
+
+    def __init__(self, rule_id: str, config: Dict, regex, order: int):
+        self.rule_id = rule_id
+        self.config = config
+        self.regex = regex
+        self.redactor = config.get("redactor") or build_redactor(rule_id, config)
+        # Constant replacements are encoded once
+        self.replacement = self.redactor.encode("utf-8") if isinstance(self.redactor, str) else None
+        self.order = order
+        self.validators = config.get("validators") or []
+
+    def replace(self, matched: bytes) -> bytes:
+        if self.replacement is not None:
+            return self.replacement
+        return self.redactor(matched.decode("utf-8", errors="replace")).encode("utf-8")
+
+class BytesScanner:
+    """Scan and redact files as raw bytes through mmap"""
+
+    def __init__(self, compiled_patterns: Dict[str, Dict]):
+        self.rules: List[BytesRule] = []
+        self.skipped_rules: List[str] = []
+        # Rules that only run their provider pattern (no generic entropy secrets)
+        self.partial_rules: List[str] = []
+
+        for order, (rule_id, rule_config) in enumerate(compiled_patterns.items()):
+            regex = self._compile(rule_id, rule_config)
+            if regex is None:
+                self.skipped_rules.append(rule_id)
+                continue
+            self.rules.append(BytesRule(rule_id, rule_config, regex, order))
+            if rule_config.get("detector") == "entropy":
+                self.partial_rules.append(rule_id)
+
+    @staticmethod
+    def _compile(rule_id: str, rule_config: Dict):
+        pattern = rule_config.get("pattern", "")
+        try:
+            raw = pattern.encode("ascii")
+        except UnicodeEncodeError:
+            print(f"[!] Rule {rule_id} is not ASCII - skipped in bytes mode")
+            return None
+        try:
+            return re.compile(raw, re.IGNORECASE | re.MULTILINE)
+        except re.error as e:
+            print(f"[!] Invalid bytes regex in rule {rule_id}: {e}")
+            return None
+
+    def _iter_rule(self, rule: BytesRule, buffer) -> Iterator[Tuple[int, int, int]]:
+        """Yield (start, -end, order) so merged streams sort leftmost-longest"""
+        for match_obj in rule.regex.finditer(buffer):
+            start, end = match_obj.span()
+            # Skip empty / whitespace-only matches, as scan_text does
+            matched = match_obj.group()
+            if start == end or not matched.strip():
+                continue
+            # Same validator stage as scan_text (validators take str)
+            if rule.validators:
+                candidate = matched.decode("latin-1")
+                if not all(check(candidate) for check in rule.validators):
+                    continue
+            yield start, -end, rule.order
+
+    def iter_matches(self, buffer) -> Iterator[Tuple[int, int, BytesRule]]:
+        """
+        Yield non-overlapping (start, end, rule) findings in file order
+
+        Each rule's finditer already yields in position order, so the streams
+        are merged lazily - memory stays proportional to the number of rules.
+        """
+        by_order = {rule.order: rule for rule in self.rules}
+        streams = [self._iter_rule(rule, buffer) for rule in self.rules]
+        last_end = 0
+        # Merged on (start, -end, order): leftmost, then longest, then rule order
+        for start, neg_end, order in heapq.merge(*streams):
+            end = -neg_end
+            if start < last_end:
+                continue
+            last_end = end
+            yield start, end, by_order[order]
+
+    def scan_file(self, input_path: str, output_path: str, on_match=None) -> Dict:
+        """
+        Redact input_path into output_path
+
+        Args:
+            input_path: File to scan
+            output_path: Destination for redacted bytes
+            on_match: Optional callback(rule_id, rule_config, matched_bytes, context_bytes)
+
+        Returns:
+            Summary with byte counts and per-rule finding counts
+        """
+        # Opening the output truncates it - never let that be the input
+        if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+            raise ValueError(f"Output file is the input file: {output_path}")
+
+        size = os.path.getsize(input_path)
+        by_rule: Dict[str, int] = {}
+
+        with open(input_path, "rb") as fin, open(output_path, "wb") as fout:
+            if size == 0:
+                return self._summary(input_path, output_path, 0, by_rule)
+
+            with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    position = 0
+                    for start, end, rule in self.iter_matches(mm):
+                        matched = mm[start:end]
+                        self._copy(fout, view, position, start)
+                        fout.write(rule.replace(matched))
+                        position = end
+
+                        by_rule[rule.rule_id] = by_rule.get(rule.rule_id, 0) + 1
+                        if on_match is not None:
+                            on_match(
+                                rule.rule_id,
+                                rule.config,
+                                matched,
+                                mm[max(0, start - 50):min(size, end + 50)]
+                            )
+                    self._copy(fout, view, position, size)
+                finally:
+                    view.release()
+
+        return self._summary(input_path, output_path, size, by_rule)
+
+    @staticmethod
+    def _copy(fout, view: memoryview, start: int, end: int):
+        while start < end:
+            stop = min(end, start + COPY_CHUNK_SIZE)
+            fout.write(view[start:stop])
+            start = stop
+
+    def _summary(self, input_path: str, output_path: str, size: int, by_rule: Dict[str, int]) -> Dict:
+        return {
+            "status": "COMPLETED",
+            "input_file": input_path,
+            "output_file": output_path,
+            "bytes_processed": size,
+            "total_incidents": sum(by_rule.values()),
+            "by_rule": by_rule,
+            "rules_skipped": list(self.skipped_rules),
+            "rules_partial": list(self.partial_rules),
+            "timestamp": datetime.now().isoformat()
+        }
@@ -10,11 +10,12 @@ from .core import AGISentinelCore, AGISentinel, ScanResult
 import os
 LICENSE = os.getenv("AGI_LICENSE_KEY", "AGPL")
 
-if LICENSE == "AGPL":
-    print("Running in AGPL (non-commercial) mode")
-else:
-    print("Running in COMMERCIAL mode")
 
+def display_license_mode():
+    if LICENSE == "AGPL":
+        print("Running in AGPL (non-commercial) mode")
+    else:
+        print("Running in COMMERCIAL mode")
 
 def display_banner():
     banner = """
@@ -64,7 +65,41 @@ def print_result(result: ScanResult, verbose: bool = False):
     
     print("="*60)
 
+def query_incidents(args):
+    """Query the SQLite incident store"""
+    from .incident_store import IncidentStore, DEFAULT_DB_PATH
+
+    db_path = args.db or DEFAULT_DB_PATH
+    if not Path(db_path).exists():
+        print(f"[!] Incident database not found: {db_path}")
+        return
+
+    store = IncidentStore(db_path, readonly=True)
+    incidents = store.query(
+        since=args.since,
+        until=args.until,
+        rule=args.rule,
+        severity=args.severity,
+        limit=args.limit
+    )
+    summary = store.summary(since=args.since, until=args.until, rule=args.rule, severity=args.severity)
+
+    print(f"\n[+] Incidents matching: {summary['total']} (showing {len(incidents)})")
+    for rule_id, count in sorted(summary['by_rule'].items()):
+        print(f"  • {rule_id}: {count}")
+    if args.verbose:
+        for incident in incidents:
+            print(f"  {incident['timestamp']}  {incident['severity']:8s} {incident['threat_type']:30s} "
+                  f"{incident['action_taken']:6s} {incident['scan_id'] or '-'}")
+
+    if args.export:
+        export_path = Path(args.export)
+        with open(export_path, 'w', encoding='utf-8') as f:
+            json.dump({"summary": summary, "incidents": incidents}, f, indent=2, ensure_ascii=False)
+        print(f"[+] Results exported to: {export_path}")
+
 def main():
+    display_license_mode()
     display_banner()
     
     parser = argparse.ArgumentParser(
@@ -73,6 +108,28 @@ def main():
     
     parser.add_argument("--text", help="Text to scan")
     parser.add_argument("--csv", help="CSV file for bulk scanning")
+    parser.add_argument("--log", help="Large text/log file for memory-mapped bytes-mode scanning")
+    parser.add_argument("--output", help="Output file for --csv/--log (default: shielded_<name>)")
+    parser.add_argument("--chunk-size", type=int, help="Rows per checkpointed chunk for --csv")
+    parser.add_argument("--checkpoint", help="Checkpoint manifest for --csv (default: <output>.checkpoint.json)")
+    parser.add_argument("--output-mode", choices=["append", "inplace", "changed"], default="append",
+                        help="CSV output layout: add shielded_ columns, overwrite in place, or only changed columns")
+    parser.add_argument("--resume", action="store_true", help="Resume --csv from its last checkpoint")
+    parser.add_argument("--stream", help="CSV/JSONL/text file to shield through the streaming pipeline")
+    parser.add_argument("--queue-size", type=int, default=1000, help="Records in flight for --stream")
+    parser.add_argument("--dir", help="Directory tree for incremental bulk scanning")
+    parser.add_argument("--output-dir", default="shielded", help="Output directory for --dir")
+    parser.add_argument("--index", help="Index file for --dir (default: <output-dir>/.sentinel_index.json)")
+    parser.add_argument("--bytes-mode-mb", type=float,
+                        help="--dir: shield .log/.txt files of at least this many MB in bytes mode (opt-in)")
+    parser.add_argument("--incidents", action="store_true", help="Query the incident database")
+    parser.add_argument("--db", help="SQLite incident database (record incidents while scanning / query with --incidents)")
+    parser.add_argument("--since", help="--incidents: ISO timestamp or relative age (30m, 24h, 7d)")
+    parser.add_argument("--until", help="--incidents: ISO timestamp or relative age")
+    parser.add_argument("--rule", help="--incidents: filter by rule ID")
+    parser.add_argument("--severity", choices=["LOW", "MEDIUM", "HIGH", "CRITICAL"], type=str.upper,
+                        help="--incidents: filter by severity")
+    parser.add_argument("--limit", type=int, default=100, help="--incidents: maximum rows listed")
     parser.add_argument("--cols", nargs='+', help="Columns to scan", default=None)
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--config", help="Custom configuration file")
@@ -82,10 +139,17 @@ def main():
     args = parser.parse_args()
     
     try:
+        # Incident queries don't need the scanning engine
+        if args.incidents:
+            query_incidents(args)
+            return
+        
         # Initialize sentinel
         sentinel = AGISentinelCore(
             config_path=args.config,
-            max_workers=min(args.workers, 16)
+            max_workers=min(args.workers, 16),
+            incident_store=args.db,
+            verbose=args.verbose
         )
         
         # Mode 1: Single text scan
@@ -113,7 +177,12 @@ def main():
             
             result = sentinel.scan_file(
                 file_path=args.csv,
-columns=args.cols
+                columns=args.cols,
+                output_path=args.output,
+                chunk_size=args.chunk_size,
+                checkpoint_path=args.checkpoint,
+                resume=args.resume,
+                output_mode=args.output_mode
             )
             
             if result['status'] == 'COMPLETED':
@@ -121,9 +190,94 @@ columns=args.cols
                 print(f"[+] Output file: {result['output_file']}")
                 print(f"[+] Rows processed: {result.get('rows_processed', 'N/A')}")
                 print(f"[+] Columns shielded: {result.get('columns_shielded', [])}")
+                for col, reason in result.get('columns_skipped', {}).items():
+                    print(f"[+] Column skipped: {col} ({reason})")
+                if result.get('resumed_from_chunk'):
+                    print(f"[+] Resumed from chunk: {result['resumed_from_chunk']}")
             else:
                 print(f"[!] Scan failed: {result.get('error', 'Unknown error')}")
         
+        # Mode 3: Large log file scan (bytes mode)
+        elif args.log:
+            if args.verbose:
+                print(f"[*] Starting bytes-mode scan of {args.log}")
+
+            result = sentinel.scan_large_file(args.log, output_path=args.output)
+
+            if result['status'] == 'COMPLETED':
+                print(f"\n[+] Scan completed successfully!")
+                print(f"[+] Output file: {result['output_file']}")
+                print(f"[+] Bytes processed: {result['bytes_processed']}")
+                print(f"[+] Incidents: {result['total_incidents']}")
+                if result['rules_skipped']:
+                    print(f"[!] Rules skipped in bytes mode: {result['rules_skipped']}")
+                if result['rules_partial']:
+                    print(f"[!] Provider patterns only (no generic entropy secrets): {result['rules_partial']}")
+            else:
+                print(f"[!] Scan failed: {result.get('error', 'Unknown error')}")
+
+        # Mode 4: Directory tree scan
+        elif args.dir:
+            from .tree_scanner import TreeScanner
+
+            if args.verbose:
+                print(f"[*] Starting incremental scan of {args.dir}")
+                print(f"[*] Workers: {args.workers}, Output: {args.output_dir}")
+
+            bytes_mode_min_size = (
+                int(args.bytes_mode_mb * 1024 * 1024) if args.bytes_mode_mb is not None else None
+            )
+            scanner = TreeScanner(sentinel, index_path=args.index, bytes_mode_min_size=bytes_mode_min_size)
+            result = scanner.scan_tree(args.dir, output_dir=args.output_dir)
+
+            if result['status'].startswith('COMPLETED'):
+                print(f"\n[+] Scan completed!")
+                print(f"[+] Output directory: {result['output_dir']}")
+                print(f"[+] Files scanned: {result['files_scanned']}")
+                print(f"[+] Files skipped (unchanged): {result['files_skipped']}")
+                if result['files_pruned']:
+                    print(f"[+] Files pruned (deleted from source): {len(result['files_pruned'])}")
+                print(f"[+] Incidents: {result['total_incidents']}")
+                if result['files_bytes_mode']:
+                    print(f"[+] Files shielded in bytes mode: {result['files_bytes_mode']}")
+                if result['rules_skipped']:
+                    print(f"[!] Rules skipped in bytes mode: {result['rules_skipped']}")
+                if result['rules_partial']:
+                    print(f"[!] Provider patterns only (no generic entropy secrets): {result['rules_partial']}")
+                for failure in result['failures']:
+                    print(f"[!] Failed: {failure['path']} - {failure['error']}")
+            else:
+                print(f"[!] Scan failed: {result.get('error', 'Unknown error')}")
+
+        # Mode 5: Streaming pipeline scan
+        elif args.stream:
+            from .pipeline import stream_file
+
+            output_path = args.output or str(Path(args.stream).with_name(f"shielded_{Path(args.stream).name}"))
+            if args.verbose:
+                print(f"[*] Streaming {args.stream} -> {output_path}")
+                print(f"[*] Workers: {args.workers}, Queue: {args.queue_size}, Fields: {args.cols or 'ALL'}")
+
+            result = stream_file(
+                sentinel,
+                args.stream,
+                output_path,
+                fields=args.cols,
+                workers=min(args.workers, 16),
+                queue_size=args.queue_size
+            )
+
+            if result['status'] == 'COMPLETED':
+                print(f"\n[+] Scan completed successfully!")
+                print(f"[+] Output file: {result['output_file']}")
+                print(f"[+] Records: {result['records']} ({result['records_per_second']}/s)")
+                print(f"[+] Incidents: {result['total_incidents']}")
+                if args.verbose:
+                    for name, stage in result['stages'].items():
+                        print(f"[+] Stage {name}: {stage['items']} items, {stage['busy_seconds']}s busy")
+            else:
+                print(f"[!] Scan failed: {result.get('error', 'Unknown error')}")
+
         # No input provided
         else:
             print("\n[AGI-SENTINEL NOTICE]")
@@ -131,6 +285,10 @@ columns=args.cols
             print("\nPlease provide one of the following options:")
             print("  --text \"your text here\"")
             print("  --csv  <file.csv>  --cols <column_name1> <column_name2>")
+            print("  --log  <file.log>  --output <file>")
+            print("  --dir  <directory> --output-dir <directory>")
+            print("  --stream <file.csv|file.jsonl|file.txt> --output <file>")
+            print("  --incidents --db <file.db> --since 7d --rule <rule_id>")
             print("\nExample:")
             print("  python -m src.agi_sentinel.cli --text \"test@example.com\"")
             print("  python -m src.agi_sentinel.cli --csv data.csv --cols email phone")
@@ -146,7 +304,7 @@ columns=args.cols
         sys.exit(1)
     
     # Final message
-    if args.text or args.csv:
+    if args.text or args.csv or args.log or args.dir or args.stream:
         print("\n" + "="*60)
         print("[*] AGI Sentinel operation completed")
         print("="*60)
@@ -0,0 +1,289 @@
+"""
+AGI Sentinel Incident Store - Indexed local SQLite incident sink
+Incidents are queued by the scanning threads and written by a background
+writer in batched transactions, so the hot path only pays for a queue put.
+Only metadata is stored: the detected value is kept as a keyed HMAC-SHA256
+and its length, never in clear. A plain digest would not do - SSNs, phone
+numbers and card numbers are small enough spaces to brute-force - so the
+HMAC uses the tokenization key ($AGI_SENTINEL_TOKEN_KEY). Without a key only
+the length is stored: a per-process key would make the HMACs uncorrelatable.
+The HMAC is computed by the writer thread; raw values only ever sit in the
+in-memory queue.
+"""
+
+import atexit
+import hashlib
+import hmac
+import os
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from .redaction import TOKEN_KEY_ENV
+
+DEFAULT_DB_PATH = "logs/sentinel_incidents.db"
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0   # seconds
+DEFAULT_MAX_QUEUE = 10000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    id INTEGER PRIMARY KEY,
+    incident_id TEXT NOT NULL,
+    scan_id TEXT,
+    threat_type TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    action_taken TEXT,
+    timestamp TEXT NOT NULL,
+    value_hmac TEXT,
+    value_length INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_incidents_timestamp ON incidents (timestamp);
+CREATE INDEX IF NOT EXISTS idx_incidents_rule ON incidents (threat_type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_incidents_severity ON incidents (severity, timestamp);
+CREATE INDEX IF NOT EXISTS idx_incidents_scan ON incidents (scan_id);
+CREATE INDEX IF NOT EXISTS idx_incidents_incident ON incidents (incident_id);
+"""
+
+_INSERT = """
+INSERT INTO incidents
+    (incident_id, scan_id, threat_type, severity, action_taken, timestamp, value_hmac, value_length)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_STOP = object()
+_RELATIVE_RE = re.compile(r"^(\d+)\s*([smhdw])$")
+_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+def parse_since(value: Optional[str]) -> Optional[str]:
+    """Accept an ISO date/time or a relative age such as 30m, 24h, 7d, 2w"""
+    if not value:
+        return None
+    match = _RELATIVE_RE.match(value.strip())
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        return (datetime.now() - timedelta(**{_UNITS[unit]: amount})).isoformat()
+    return datetime.fromisoformat(value.strip()).isoformat()
+
+class IncidentStore:
+    """SQLite incident sink with a batched background writer and a query API"""
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        value_key: Optional[Union[str, bytes]] = None,
+        readonly: bool = False
+    ):
+        """
+        Args:
+            db_path: SQLite database file
+            batch_size: Incidents per write transaction
+            flush_interval: Seconds the writer waits before committing a partial batch
+            max_queue: Incidents queued before add() blocks
+            value_key: HMAC key for detected values (default: $AGI_SENTINEL_TOKEN_KEY)
+            readonly: Open an existing database for queries only - no writer thread
+        """
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.readonly = readonly
+        self.written = 0
+
+        if readonly:
+            self._closed = True
+            return
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        key = value_key or os.getenv(TOKEN_KEY_ENV)
+        if key:
+            key = key.encode("utf-8") if isinstance(key, str) else key
+            self._value_mac = hmac.new(key, digestmod=hashlib.sha256)
+        else:
+            self._value_mac = None
+            print(f"[!] No tokenization key set ({TOKEN_KEY_ENV}) - "
+                  f"incident store {self.db_path} records value lengths only, not value HMACs")
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="sentinel-incident-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.readonly:
+            conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+        else:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _value_digest(self, value: str) -> Optional[str]:
+        if self._value_mac is None:
+            return None
+        mac = self._value_mac.copy()
+        mac.update(value.encode("utf-8", errors="replace"))
+        return mac.hexdigest()
+
+    # -------------------- write path --------------------
+    def add(self, incident, scan_id: Optional[str] = None):
+        """Queue an incident (blocks only if the writer falls max_queue behind)"""
+        if self.readonly:
+            raise ValueError(f"Incident store opened read-only: {self.db_path}")
+        if self._closed:
+            return
+        value = incident.detected_value or ""
+        self._queue.put((
+            incident.incident_id,
+            scan_id or getattr(incident, "scan_id", "") or None,
+            incident.threat_type,
+            incident.severity,
+            incident.action_taken,
+            incident.timestamp,
+            value,
+            len(value)
+        ))
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            while True:
+                batch = []
+                stop = False
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                while True:
+                    if item is _STOP:
+                        stop = True
+                        self._queue.task_done()
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    self._write(conn, batch)
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: List[tuple]):
+        try:
+            rows = [row[:6] + (self._value_digest(row[6]),) + row[7:] for row in batch]
+            with conn:
+                conn.executemany(_INSERT, rows)
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            print(f"[!] Failed to write {len(batch)} incidents to {self.db_path}: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued incident is committed"""
+        if self.readonly:
+            return
+        self._queue.join()
+
+    def close(self):
+        """Flush pending incidents and stop the writer"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    # -------------------- query API --------------------
+    @staticmethod
+    def _where(since, until, rule, severity, scan_id, action):
+        clauses, params = [], []
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        if rule:
+            clauses.append("threat_type = ?")
+            params.append(rule)
+        if severity:
+            clauses.append("severity = ?")
+            params.append(severity.upper())
+        if scan_id:
+            clauses.append("scan_id = ?")
+            params.append(scan_id)
+        if action:
+            clauses.append("action_taken = ?")
+            params.append(action.upper())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        rule: Optional[str] = None,
+        severity: Optional[str] = None,
+        scan_id: Optional[str] = None,
+        action: Optional[str] = None,
+        limit: Optional[int] = 1000
+    ) -> List[Dict]:
+        """
+        Query stored incidents, newest first
+
+        Args:
+            since / until: ISO timestamps or relative ages (7d, 24h, ...)
+            rule: Threat type / rule ID
+            severity: LOW, MEDIUM, HIGH or CRITICAL
+            scan_id: Scan that produced the incidents
+            action: REDACT, BLOCK or ALERT
+            limit: Maximum rows (None for all)
+        """
+        where, params = self._where(parse_since(since), parse_since(until), rule, severity, scan_id, action)
+        sql = (
+            "SELECT incident_id, scan_id, threat_type, severity, action_taken, timestamp, "
+            f"value_hmac, value_length FROM incidents {where} ORDER BY timestamp DESC"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def summary(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        rule: Optional[str] = None,
+        severity: Optional[str] = None
+    ) -> Dict:
+        """Incident counts by rule and severity - the basis of compliance reports"""
+        where, params = self._where(parse_since(since), parse_since(until), rule, severity, None, None)
+        with closing(self._connect()) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM incidents {where}", params).fetchone()[0]
+            by_rule = {
+                row[0]: row[1] for row in conn.execute(
+                    f"SELECT threat_type, COUNT(*) FROM incidents {where} GROUP BY threat_type", params)
+            }
+            by_severity = {
+                row[0]: row[1] for row in conn.execute(
+                    f"SELECT severity, COUNT(*) FROM incidents {where} GROUP BY severity", params)
+            }
+        return {"total": total, "by_rule": by_rule, "by_severity": by_severity}
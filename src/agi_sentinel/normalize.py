@@ -0,0 +1,173 @@
+"""
+AGI Sentinel Normalization - One normalized scanning view with offset mapping
+Full-width forms, zero-width characters and homoglyphs let attackers slip
+past the rules. Instead of scanning twice, the core builds a single view of
+the text - NFKC, invisible characters removed, confusable dashes/dots and
+non-ASCII decimal digits folded to ASCII - runs every rule once on that view
+and maps each finding back to its span in the original text.
+
+Homoglyph letters are only folded inside mixed-script words (TR39-style
+mixed-script detection): a word combining Latin letters with Cyrillic/Greek
+lookalikes ("іgnore", "ехample") is folded, ordinary Cyrillic or Greek text
+is left alone so it cannot turn into Latin keywords.
+
+Pure-ASCII text (the common case) skips the view entirely, and ASCII runs
+inside mixed text are copied through without per-character work.
+"""
+
+import re
+import unicodedata
+from array import array
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Homoglyph letters not folded by NFKC (subset of Unicode TR39 confusables);
+# applied to mixed-script words only
+CONFUSABLES = {
+    # Cyrillic
+    "а": "a", "в": "b", "с": "c", "ԁ": "d", "е": "e", "һ": "h", "і": "i", "ј": "j",
+    "к": "k", "м": "m", "о": "o", "р": "p", "ԛ": "q", "ѕ": "s", "т": "t",
+    "у": "y", "х": "x", "ԝ": "w", "ь": "b", "ӏ": "l",
+    "А": "A", "В": "B", "С": "C", "Е": "E", "Н": "H", "І": "I", "Ј": "J", "К": "K",
+    "М": "M", "О": "O", "Р": "P", "Ѕ": "S", "Т": "T", "Х": "X", "У": "Y", "Ԝ": "W",
+    # Greek
+    "α": "a", "ε": "e", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p", "τ": "t",
+    "υ": "u", "χ": "x", "ω": "w",
+    "Α": "A", "Β": "B", "Ε": "E", "Ζ": "Z", "Η": "H", "Ι": "I", "Κ": "K", "Μ": "M",
+    "Ν": "N", "Ο": "O", "Ρ": "P", "Τ": "T", "Υ": "Y", "Χ": "X",
+    # Latin lookalikes
+    "ı": "i", "ȷ": "j", "ɡ": "g", "ɩ": "i", "ʏ": "y", "ᴀ": "A", "ᴄ": "c", "ᴏ": "o",
+    "ᴠ": "v", "ᴡ": "w", "ᴢ": "z",
+}
+
+# Punctuation used to disguise e-mail addresses and separators (always folded)
+PUNCTUATION_CONFUSABLES = {
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-", "−": "-", "․": ".", "。": ".",
+}
+
+_NON_ASCII_RUN = re.compile(r"[^\x00-\x7f]+")
+_WORD = re.compile(r"[^\W_]+")
+_HAS_CONFUSABLE = re.compile("[" + "".join(CONFUSABLES) + "]")
+_CONFUSABLE_TABLE = str.maketrans(CONFUSABLES)
+
+def _is_invisible(ch: str) -> bool:
+    """Format characters (ZWSP, ZWJ, soft hyphen, bidi controls, tags) and variation selectors"""
+    if unicodedata.category(ch) == "Cf":
+        return True
+    code = ord(ch)
+    return 0xFE00 <= code <= 0xFE0F or 0xE0100 <= code <= 0xE01EF
+
+def _fold(ch: str) -> str:
+    """Fold one character to one character (keeps offsets 1:1)"""
+    folded = PUNCTUATION_CONFUSABLES.get(ch)
+    if folded is not None:
+        return folded
+    if not ch.isascii() and ch.isdecimal():
+        return str(unicodedata.decimal(ch))
+    return ch
+
+@lru_cache(maxsize=4096)
+def _normalize_group(group: str) -> str:
+    """NFKC + invisible stripping + folding for a base character and its marks ("" if invisible)"""
+    return "".join(
+        _fold(ch) for ch in unicodedata.normalize("NFKC", group) if not _is_invisible(ch)
+    )
+
+def _is_mixed_script(word: str) -> bool:
+    """Latin letters next to Cyrillic/Greek/Latin-lookalike confusables"""
+    return any(ch.isascii() and ch.isalpha() for ch in word) and _HAS_CONFUSABLE.search(word) is not None
+
+def _fold_mixed_words(text: str) -> str:
+    """Fold homoglyph letters inside mixed-script words (1:1, offsets unchanged)"""
+    if _HAS_CONFUSABLE.search(text) is None:
+        return text
+    pieces = []
+    position = 0
+    for word_match in _WORD.finditer(text):
+        word = word_match.group()
+        if word.isascii() or not _is_mixed_script(word):
+            continue
+        start, end = word_match.span()
+        pieces.append(text[position:start])
+        pieces.append(word.translate(_CONFUSABLE_TABLE))
+        position = end
+    if not pieces:
+        return text
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+class NormalizedView:
+    """
+    Normalized text plus, per view character, the [start, end) range of the
+    original characters it came from
+    """
+    __slots__ = ("text", "starts", "ends")
+
+    def __init__(self, text: str, starts: array, ends: array):
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+
+    def map_span(self, start: int, end: int) -> Tuple[int, int]:
+        """Map a non-empty view span back to the original text"""
+        return self.starts[start], self.ends[end - 1]
+
+def build_view(text: str) -> Optional[NormalizedView]:
+    """
+    Build the normalized view of text
+
+    Returns None when scanning the original directly is equivalent
+    (pure ASCII, or nothing changed).
+    """
+    if text.isascii():
+        return None
+
+    pieces = []
+    starts = array("L")
+    ends = array("L")
+    position = 0
+    combining = unicodedata.combining
+    normalize_group = _normalize_group
+
+    for run in _NON_ASCII_RUN.finditer(text):
+        run_start, run_end = run.span()
+        # A leading combining mark composes with the ASCII character before it
+        if run_start > position and combining(text[run_start]):
+            run_start -= 1
+
+        # ASCII stretch: identity mapping
+        if run_start > position:
+            pieces.append(text[position:run_start])
+            starts.extend(range(position, run_start))
+            ends.extend(range(position + 1, run_start + 1))
+
+        index = run_start
+        while index < run_end:
+            # Base character plus its combining marks normalize together
+            group_end = index + 1
+            while group_end < run_end and combining(text[group_end]):
+                group_end += 1
+
+            normalized = normalize_group(text[index:group_end])
+            if len(normalized) == 1:
+                pieces.append(normalized)
+                starts.append(index)
+                ends.append(group_end)
+            elif normalized:
+                pieces.append(normalized)
+                starts.extend([index] * len(normalized))
+                ends.extend([group_end] * len(normalized))
+            index = group_end
+
+        position = run_end
+
+    if position < len(text):
+        pieces.append(text[position:])
+        starts.extend(range(position, len(text)))
+        ends.extend(range(position + 1, len(text) + 1))
+
+    view_text = _fold_mixed_words("".join(pieces))
+    if view_text == text:
+        return None
+
+    return NormalizedView(view_text, starts, ends)
@@ -0,0 +1,390 @@
+"""
+AGI Sentinel Pipeline - Composable reader -> scanner -> writer streaming
+A source generator feeds a bounded queue, N scanner workers shield records
+and a single writer drains the results into a sink in input order. At most
+queue_size records are in flight at any time, so a slow sink or scanner
+throttles the reader (backpressure) and memory stays bounded whatever the
+input size, while file I/O overlaps scanning.
+
+Scanning is pure-Python regex work, so extra workers mostly hide I/O latency
+rather than scale across cores.
+"""
+
+import csv
+import json
+import os
+import sys
+import threading
+import time
+import queue
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .core import AGISentinelCore
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 1000
+_POLL_INTERVAL = 0.1   # seconds between stop checks while waiting
+_DONE = object()
+# Cells of a CSV row past the header's last column (kept, scanned and written back)
+CSV_EXTRA_KEY = "__extra_cells__"
+
+# ==================== SOURCES ====================
+def text_source(path: str) -> Iterator[str]:
+    """Yield lines of a text / log file (line endings kept)"""
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        yield from f
+
+def csv_source(path: str) -> Iterator[Dict[str, str]]:
+    """Yield CSV rows as {column: value} dicts; short rows are padded with "" """
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        yield from csv.DictReader(f, restkey=CSV_EXTRA_KEY, restval="")
+
+def jsonl_source(path: str) -> Iterator:
+    """Yield parsed records of a JSON Lines file (blank lines skipped)"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+# ==================== SINKS ====================
+class _Sink:
+    """File or stream sink; "-" writes to stdout"""
+
+    def __init__(self, target, newline: Optional[str] = None):
+        if target == "-":
+            self._stream, self._owned = sys.stdout, False
+        elif hasattr(target, "write"):
+            self._stream, self._owned = target, False
+        else:
+            self._stream = open(target, "w", encoding="utf-8", newline=newline)
+            self._owned = True
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def close(self):
+        if self._owned:
+            self._stream.close()
+        else:
+            self._stream.flush()
+
+class TextSink(_Sink):
+    """Write string records as-is"""
+
+    def __init__(self, target):
+        super().__init__(target, newline="")
+
+    def write(self, record: str):
+        self._stream.write(record)
+
+class JsonlSink(_Sink):
+    """Write one JSON document per line"""
+
+    def write(self, record):
+        self._stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+class CsvSink(_Sink):
+    """
+    Write dict records; the header comes from fieldnames or the first record
+
+    Cells under CSV_EXTRA_KEY (ragged rows from csv_source) are appended after
+    the last column; any other key missing from the header is an error.
+    """
+
+    def __init__(self, target, fieldnames: Optional[List[str]] = None):
+        super().__init__(target, newline="")
+        self.fieldnames = fieldnames
+        self._writer = None
+        self._columns = None
+
+    def write(self, record: Dict):
+        if self._writer is None:
+            self.fieldnames = self.fieldnames or [key for key in record if key != CSV_EXTRA_KEY]
+            self._columns = set(self.fieldnames) | {CSV_EXTRA_KEY}
+            self._writer = csv.writer(self._stream)
+            self._writer.writerow(self.fieldnames)
+        unknown = record.keys() - self._columns
+        if unknown:
+            raise ValueError(f"Record fields not in the CSV header: {', '.join(sorted(map(str, unknown)))}")
+        extra = record.get(CSV_EXTRA_KEY) or []
+        self._writer.writerow([record.get(key, "") for key in self.fieldnames] + list(extra))
+
+# Source / sink selection by file extension
+SOURCES: Dict[str, Callable[[str], Iterator]] = {
+    ".csv": csv_source,
+    ".jsonl": jsonl_source,
+    ".ndjson": jsonl_source,
+    ".txt": text_source,
+    ".log": text_source,
+    ".md": text_source,
+}
+
+SINKS: Dict[str, Callable] = {
+    ".csv": CsvSink,
+    ".jsonl": JsonlSink,
+    ".ndjson": JsonlSink,
+    ".txt": TextSink,
+    ".log": TextSink,
+    ".md": TextSink,
+}
+
+# ==================== SCANNER ====================
+class RecordScanner:
+    """
+    Shield one record and return (record, incident count)
+
+    Strings are scanned as lines (line ending kept), dicts field by field
+    (only `fields` when given) and anything else recursively.
+    """
+
+    def __init__(self, sentinel: AGISentinelCore, fields: Optional[List[str]] = None):
+        self.sentinel = sentinel
+        self.fields = fields
+
+    def __call__(self, record) -> Tuple[object, int]:
+        if isinstance(record, str):
+            body = record.rstrip("\r\n")
+            if not body:
+                return record, 0
+            result = self.sentinel.scan_text(body)
+            return result.processed_text + record[len(body):], len(result.incidents)
+
+        if isinstance(record, dict) and self.fields is not None:
+            incidents = 0
+            shielded = dict(record)
+            # Ragged-row cells belong to no column, so they are always scanned
+            for field_name in (*self.fields, CSV_EXTRA_KEY):
+                if field_name in shielded:
+                    shielded[field_name], count = self.sentinel.scan_value(shielded[field_name])
+                    incidents += count
+            return shielded, incidents
+
+        return self.sentinel.scan_value(record)
+
+# ==================== PIPELINE ====================
+class StageCounter:
+    """Items handled and busy time of one pipeline stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float, items: int = 1):
+        with self._lock:
+            self.items += items
+            self.busy_seconds += seconds
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "items": self.items,
+                "busy_seconds": round(self.busy_seconds, 4),
+                "items_per_busy_second": round(self.items / self.busy_seconds, 1) if self.busy_seconds else None
+            }
+
+class Pipeline:
+    """
+    Stream records from a source through scanner workers into a sink
+
+    Args:
+        source: Any iterable of records (see text_source / csv_source / jsonl_source)
+        scanner: Callable record -> (shielded record, incident count), e.g. RecordScanner
+        sink: Object with write(record) and close() (see TextSink / JsonlSink / CsvSink)
+        workers: Scanner threads
+        queue_size: Maximum records in flight between the stages
+        ordered: Write records in input order (otherwise as soon as they are scanned)
+    """
+
+    def __init__(
+        self,
+        source: Iterable,
+        scanner: Callable,
+        sink,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        ordered: bool = True
+    ):
+        self.source = source
+        self.scanner = scanner
+        self.sink = sink
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.ordered = ordered
+        self.counters = {name: StageCounter(name) for name in ("source", "scanner", "sink")}
+
+    def _read(self, in_queue, slots, stop, errors):
+        try:
+            iterator = iter(self.source)
+            seq = 0
+            while True:
+                # Backpressure: wait for a free in-flight slot before reading on
+                while not slots.acquire(timeout=_POLL_INTERVAL):
+                    if stop.is_set():
+                        return
+                started = time.perf_counter()
+                try:
+                    record = next(iterator)
+                except StopIteration:
+                    slots.release()
+                    break
+                self.counters["source"].add(time.perf_counter() - started)
+                in_queue.put((seq, record))
+                seq += 1
+        except Exception as e:
+            errors.append(f"source: {e}")
+            stop.set()
+        finally:
+            for _ in range(self.workers):
+                in_queue.put(_DONE)
+
+    def _scan(self, in_queue, out_queue, stop, errors):
+        try:
+            while not stop.is_set():
+                try:
+                    item = in_queue.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                seq, record = item
+                started = time.perf_counter()
+                shielded, incidents = self.scanner(record)
+                self.counters["scanner"].add(time.perf_counter() - started)
+                out_queue.put((seq, shielded, incidents))
+        except Exception as e:
+            errors.append(f"scanner: {e}")
+            stop.set()
+        finally:
+            out_queue.put(_DONE)
+
+    def run(self) -> Dict:
+        """Run the pipeline to completion; the sink is closed afterwards"""
+        in_queue: "queue.Queue" = queue.Queue(self.queue_size + self.workers)
+        out_queue: "queue.Queue" = queue.Queue(self.queue_size + self.workers)
+        slots = threading.Semaphore(self.queue_size)
+        stop = threading.Event()
+        errors: List[str] = []
+
+        threads = [threading.Thread(target=self._read, args=(in_queue, slots, stop, errors),
+                                    name="sentinel-pipeline-source", daemon=True)]
+        threads += [
+            threading.Thread(target=self._scan, args=(in_queue, out_queue, stop, errors),
+                             name=f"sentinel-pipeline-scanner-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        records = incidents = 0
+        pending: Dict[int, object] = {}
+        next_seq = 0
+        finished_workers = 0
+        sink_counter = self.counters["sink"]
+        try:
+            while finished_workers < self.workers and not stop.is_set():
+                try:
+                    item = out_queue.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    finished_workers += 1
+                    continue
+
+                seq, shielded, count = item
+                incidents += count
+                if not self.ordered:
+                    ready = [shielded]
+                else:
+                    pending[seq] = shielded
+                    ready = []
+                    while next_seq in pending:
+                        ready.append(pending.pop(next_seq))
+                        next_seq += 1
+
+                for record in ready:
+                    write_started = time.perf_counter()
+                    self.sink.write(record)
+                    sink_counter.add(time.perf_counter() - write_started)
+                    records += 1
+                    slots.release()
+        except Exception as e:
+            errors.append(f"sink: {e}")
+            stop.set()
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            try:
+                self.sink.close()
+            except Exception as e:
+                errors.append(f"sink: {e}")
+
+        elapsed = time.perf_counter() - started
+        result = {
+            "status": "ERROR" if errors else "COMPLETED",
+            "records": records,
+            "total_incidents": incidents,
+            "elapsed_seconds": round(elapsed, 4),
+            "records_per_second": round(records / elapsed, 1) if elapsed else None,
+            "workers": self.workers,
+            "stages": {name: counter.to_dict() for name, counter in self.counters.items()},
+            "timestamp": datetime.now().isoformat()
+        }
+        if errors:
+            result["error"] = "; ".join(errors)
+        return result
+
+def stream_file(
+    sentinel: AGISentinelCore,
+    input_path: str,
+    output_path: str,
+    fields: Optional[List[str]] = None,
+    workers: int = DEFAULT_WORKERS,
+    queue_size: int = DEFAULT_QUEUE_SIZE
+) -> Dict:
+    """
+    Shield a CSV / JSONL / text file through a Pipeline
+
+    Source and sink are chosen by extension; output_path "-" writes to stdout
+    (in the input's format).
+    """
+    suffix = Path(input_path).suffix.lower()
+    if suffix not in SOURCES:
+        return {
+            "status": "ERROR",
+            "error": f"Unsupported file type: {suffix or input_path}",
+            "timestamp": datetime.now().isoformat()
+        }
+    if not Path(input_path).exists():
+        return {
+            "status": "ERROR",
+            "error": f"File not found: {input_path}",
+            "timestamp": datetime.now().isoformat()
+        }
+    # The sink truncates its file before the lazy source reads a line
+    if output_path != "-" and os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        return {
+            "status": "ERROR",
+            "error": f"Output file is the input file: {output_path}",
+            "timestamp": datetime.now().isoformat()
+        }
+
+    sink_suffix = suffix if output_path == "-" else Path(output_path).suffix.lower()
+    sink = SINKS.get(sink_suffix, SINKS[suffix])(output_path)
+    pipeline = Pipeline(
+        SOURCES[suffix](input_path),
+        RecordScanner(sentinel, fields),
+        sink,
+        workers=workers,
+        queue_size=queue_size
+    )
+    result = pipeline.run()
+    result["input_file"] = input_path
+    result["output_file"] = output_path
+    return result
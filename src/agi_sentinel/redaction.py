@@ -0,0 +1,105 @@
+"""
+AGI Sentinel Redaction - Replacements precomputed per rule
+Each rule's "redaction_mode" is turned into a redactor once, when rules are
+compiled, so scanning never formats markers per match:
+
+    FULL      [REDACTED_<RULE>]                      (a constant string)
+    PARTIAL   [REDACTED_<RULE>]@example.com          (e-mail: keep the domain)
+              [REDACTED_<RULE>]1111                  (numbers: keep the last digits)
+    TOKENIZE  [TOKEN_<RULE>_<hmac>]                  (keyed HMAC-SHA256, stable per key)
+
+A redactor is either a str (FULL - no call at all) or a callable taking the
+matched text. Tokens are only stable across runs when a key is configured
+(tokenization_key or the AGI_SENTINEL_TOKEN_KEY environment variable).
+"""
+
+import hashlib
+import hmac
+import os
+import threading
+from typing import Callable, Dict, Optional, Union
+
+REDACTION_MODES = ("FULL", "PARTIAL", "TOKENIZE")
+DEFAULT_KEEP_LAST = 4       # digits kept by PARTIAL
+DEFAULT_TOKEN_LENGTH = 16   # hex characters of the HMAC kept by TOKENIZE
+TOKEN_KEY_ENV = "AGI_SENTINEL_TOKEN_KEY"
+
+Redactor = Union[str, Callable[[str], str]]
+
+_process_key: Optional[bytes] = None
+_process_key_lock = threading.Lock()
+
+def resolve_token_key(key: Optional[Union[str, bytes]] = None) -> bytes:
+    """Explicit key, else $AGI_SENTINEL_TOKEN_KEY, else a random per-process key"""
+    global _process_key
+    if key is None:
+        key = os.getenv(TOKEN_KEY_ENV)
+    if key:
+        return key.encode("utf-8") if isinstance(key, str) else key
+
+    with _process_key_lock:
+        if _process_key is None:
+            print(f"[!] No tokenization key set ({TOKEN_KEY_ENV}) - tokens are only stable within this process")
+            _process_key = os.urandom(32)
+        return _process_key
+
+def redact(redactor: Redactor, value: str) -> str:
+    """Apply a redactor to a matched value"""
+    return redactor if isinstance(redactor, str) else redactor(value)
+
+def _partial_redactor(marker: str, keep_last: int) -> Callable[[str], str]:
+    def partial(value: str) -> str:
+        # E-mail: hide the local part, keep the domain
+        at = value.rfind("@")
+        if at > 0:
+            return marker + value[at:]
+
+        # Numbers: keep the trailing digits (and separators between them)
+        # only when at least as many digits stay hidden
+        if keep_last > 0:
+            positions = [i for i, ch in enumerate(value) if ch.isdigit()]
+            if len(positions) >= 2 * keep_last:
+                return marker + value[positions[-keep_last]:]
+        return marker
+    return partial
+
+def _token_redactor(rule_id: str, key: bytes, length: int) -> Callable[[str], str]:
+    # Keyed state is prepared once; each call only copies and updates it
+    base = hmac.new(key, digestmod=hashlib.sha256)
+    prefix = f"[TOKEN_{rule_id}_"
+
+    def tokenize(value: str) -> str:
+        mac = base.copy()
+        mac.update(value.encode("utf-8"))
+        return prefix + mac.hexdigest()[:length] + "]"
+    return tokenize
+
+def build_redactor(
+    rule_id: str,
+    rule_config: Dict,
+    token_key: Optional[Union[str, bytes]] = None
+) -> Redactor:
+    """
+    Precompute the redactor for a rule
+
+    Rule fields:
+        redaction_mode: FULL (default), PARTIAL or TOKENIZE
+        partial_keep_last: Digits kept by PARTIAL (default 4)
+        token_length: Hex characters kept by TOKENIZE (default 16)
+    """
+    marker = f"[REDACTED_{rule_id}]"
+    mode = str(rule_config.get("redaction_mode") or "FULL").upper()
+
+    if mode == "FULL":
+        return marker
+    if mode == "PARTIAL":
+        return _partial_redactor(marker, int(rule_config.get("partial_keep_last", DEFAULT_KEEP_LAST)))
+    if mode == "TOKENIZE":
+        return _token_redactor(
+            rule_id,
+            resolve_token_key(token_key),
+            int(rule_config.get("token_length", DEFAULT_TOKEN_LENGTH))
+        )
+
+    print(f"[!] Unknown redaction mode '{mode}' in rule {rule_id} - using FULL")
+    return marker
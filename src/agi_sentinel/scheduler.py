@@ -0,0 +1,112 @@
+"""
+AGI Sentinel Rule Scheduler - Adaptive rule evaluation order
+Tracks per-rule cost (seconds per character) and hit rate as exponentially
+decayed averages and periodically reorders rule evaluation to minimise the
+expected cost of a scan.
+
+With BLOCK short-circuiting a hit on a BLOCK rule ends the scan for every
+non-BLOCK rule, so BLOCK rules go first, cheapest-per-expected-hit first
+(classic cost / probability ordering). Non-BLOCK rules always run when no
+BLOCK rule fires, so they follow in ascending cost. Results never depend on
+this order - the core sorts findings by the canonical rule order.
+"""
+
+import threading
+from typing import Dict, List, Tuple
+
+DEFAULT_DECAY = 0.05            # weight of the newest observation
+DEFAULT_REORDER_INTERVAL = 100  # scans between reorderings
+_MIN_HIT_RATE = 1e-4            # keeps never-hit rules finite in cost/p ordering
+
+class RuleStats:
+    """Decayed cost and hit-rate estimates for one rule"""
+    __slots__ = ("cost_per_char", "hit_rate", "evaluations", "hits")
+
+    def __init__(self):
+        self.cost_per_char = 0.0
+        self.hit_rate = 0.0
+        self.evaluations = 0
+        self.hits = 0
+
+    def update(self, cost_per_char: float, hit: bool, decay: float):
+        if self.evaluations == 0:
+            self.cost_per_char = cost_per_char
+            self.hit_rate = 1.0 if hit else 0.0
+        else:
+            self.cost_per_char += decay * (cost_per_char - self.cost_per_char)
+            self.hit_rate += decay * ((1.0 if hit else 0.0) - self.hit_rate)
+        self.evaluations += 1
+        self.hits += hit
+
+class RuleScheduler:
+    """Online, decayed-average scheduler for rule evaluation order"""
+
+    def __init__(
+        self,
+        compiled_patterns: Dict[str, Dict],
+        decay: float = DEFAULT_DECAY,
+        reorder_interval: int = DEFAULT_REORDER_INTERVAL
+    ):
+        self.decay = decay
+        self.reorder_interval = reorder_interval
+        self._block_rules = {
+            rule_id for rule_id, config in compiled_patterns.items()
+            if config.get("action") == "BLOCK"
+        }
+        self._stats: Dict[str, RuleStats] = {rule_id: RuleStats() for rule_id in compiled_patterns}
+        self._order: Tuple[str, ...] = tuple(compiled_patterns)
+        self._scans = 0
+        self._reorders = 0
+        self._lock = threading.Lock()
+
+    @property
+    def order(self) -> Tuple[str, ...]:
+        """Current evaluation order (an immutable snapshot)"""
+        return self._order
+
+    def record(self, rule_id: str, seconds: float, chars: int, hit: bool):
+        stats = self._stats.get(rule_id)
+        if stats is None:
+            return
+        with self._lock:
+            stats.update(seconds / max(1, chars), hit, self.decay)
+
+    def end_scan(self):
+        """Count a finished scan and reorder every reorder_interval scans"""
+        with self._lock:
+            self._scans += 1
+            if self._scans % self.reorder_interval:
+                return
+            self._order = tuple(self._compute_order())
+            self._reorders += 1
+
+    def _compute_order(self) -> List[str]:
+        def block_key(rule_id: str):
+            stats = self._stats[rule_id]
+            return stats.cost_per_char / max(stats.hit_rate, _MIN_HIT_RATE), rule_id
+
+        def cost_key(rule_id: str):
+            return self._stats[rule_id].cost_per_char, rule_id
+
+        block = sorted((r for r in self._stats if r in self._block_rules), key=block_key)
+        rest = sorted((r for r in self._stats if r not in self._block_rules), key=cost_key)
+        return block + rest
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "order": list(self._order),
+                "scans": self._scans,
+                "reorders": self._reorders,
+                "decay": self.decay,
+                "rules": {
+                    rule_id: {
+                        "avg_cost_us_per_kchar": round(stats.cost_per_char * 1e9, 3),
+                        "hit_rate": round(stats.hit_rate, 4),
+                        "evaluations": stats.evaluations,
+                        "hits": stats.hits,
+                        "block": rule_id in self._block_rules
+                    }
+                    for rule_id, stats in self._stats.items()
+                }
+            }
@@ -0,0 +1,174 @@
+"""
+AGI Sentinel Schema Profiling - Choose which columns are worth scanning
+Columns are profiled by dtype and by sampling their values. A column is only
+skipped when none of its values can hold a finding: booleans, datetimes,
+empty columns and numbers that are too short to be a card, SSN, phone or
+account number.
+
+Columns of plain integers (numeric IDs, account numbers) are scanned with the
+numeric-safe rules only - checksum-validated card numbers - because SSN and
+phone patterns misfire on arbitrary digit runs. column_rules opts a column
+back into more rules.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Shortest digit run any built-in/shipped numeric rule can match (7-digit phone)
+MIN_SENSITIVE_DIGITS = 7
+DEFAULT_SAMPLE_SIZE = 1000
+
+# Rules that stay reliable on bare integers (Luhn-validated)
+NUMERIC_SAFE_RULES = ("PII_CREDIT_CARD",)
+
+# A plain number: sign, digits, optional fraction/exponent - nothing a text rule can hit
+_NUMBER = r"[-+]?\d*(?:\.\d*)?(?:[eE][-+]?\d+)?"
+_NUMBER_RE = re.compile(_NUMBER)
+# What pandas parses as bool - the same columns are skipped when read as text
+_BOOLEAN_LITERALS = frozenset({"True", "False", "true", "false", "TRUE", "FALSE"})
+_SHORT_NUMBER_RE = re.compile(rf"(?!.*\d{{{MIN_SENSITIVE_DIGITS}}}){_NUMBER}")
+# A plain integer, as text (a float column of integers keeps its ".0")
+_INTEGER_RE = re.compile(r"[-+]?\d+(?:\.0*)?")
+
+OUTPUT_MODES = ("append", "inplace", "changed")
+
+def _is_number(value: str) -> bool:
+    return _NUMBER_RE.fullmatch(value) is not None
+
+def numeric_safe_rules(compiled_patterns: Dict) -> List[str]:
+    """The NUMERIC_SAFE_RULES present in a rule set"""
+    return [rule_id for rule_id in NUMERIC_SAFE_RULES if rule_id in compiled_patterns]
+
+def _integer_profile(numeric_rules: List[str]) -> Dict:
+    if not numeric_rules:
+        return {"scan": False, "reason": "integers (no numeric-safe rules loaded)"}
+    return {"scan": True, "rules": list(numeric_rules),
+            "reason": f"integers - scanned with {', '.join(numeric_rules)} only"}
+
+def _profile_strings(values, sample_size: int, numeric_rules: List[str]) -> Dict:
+    """Profile a Series of non-empty strings"""
+    if values.empty:
+        return {"scan": False, "reason": "empty"}
+
+    # Cheap pre-filter: a single text-like value in the sample settles it
+    step = max(1, len(values) // sample_size)
+    sample = values.iloc[::step]
+    if not all(_is_number(v) for v in sample):
+        # Boolean literals read as text (batch mode reads every cell as str)
+        if all(v in _BOOLEAN_LITERALS for v in sample) and values.isin(_BOOLEAN_LITERALS).all():
+            return {"scan": False, "reason": "boolean column"}
+        return {"scan": True, "reason": "text"}
+
+    # Sample looks numeric - confirm on the full column before skipping
+    if values.str.fullmatch(_SHORT_NUMBER_RE.pattern).all():
+        return {"scan": False, "reason": f"numbers shorter than {MIN_SENSITIVE_DIGITS} digits"}
+    if values.str.fullmatch(_INTEGER_RE.pattern).all():
+        return _integer_profile(numeric_rules)
+    return {"scan": True, "reason": "numeric text with long digit runs"}
+
+def profile_column(series, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                   numeric_rules: Optional[List[str]] = None) -> Dict:
+    """
+    Decide whether a single column needs scanning
+
+    Args:
+        series: Column values
+        sample_size: Values sampled before confirming on the full column
+        numeric_rules: Rules applied to integer columns (default: NUMERIC_SAFE_RULES)
+
+    Returns:
+        {"dtype": str, "scan": bool, "reason": str} plus "rules" when the
+        column should only be scanned with a subset of the rules
+    """
+    from pandas.api import types
+
+    if numeric_rules is None:
+        numeric_rules = list(NUMERIC_SAFE_RULES)
+
+    dtype = str(series.dtype)
+    if types.is_bool_dtype(series) or types.is_datetime64_any_dtype(series) \
+            or types.is_timedelta64_dtype(series):
+        return {"dtype": dtype, "scan": False, "reason": f"{dtype} column"}
+
+    non_null = series.dropna()
+    if types.is_integer_dtype(series):
+        if non_null.empty:
+            return {"dtype": dtype, "scan": False, "reason": "empty"}
+        if int(non_null.abs().max()) < 10 ** (MIN_SENSITIVE_DIGITS - 1):
+            return {"dtype": dtype, "scan": False,
+                    "reason": f"integers shorter than {MIN_SENSITIVE_DIGITS} digits"}
+        return {"dtype": dtype, **_integer_profile(numeric_rules)}
+
+    values = non_null.astype(str)
+    values = values[values != ""]
+    return {"dtype": dtype, **_profile_strings(values, sample_size, numeric_rules)}
+
+def profile_columns(df, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                    numeric_rules: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """Profile every column of a DataFrame"""
+    return {col: profile_column(df[col], sample_size, numeric_rules) for col in df.columns}
+
+def select_columns(df, columns: Optional[List[str]] = None,
+                   sample_size: int = DEFAULT_SAMPLE_SIZE,
+                   numeric_rules: Optional[List[str]] = None,
+                   column_rules: Optional[Dict[str, List[str]]] = None):
+    """
+    Resolve the columns to scan and the rules to scan them with
+
+    Explicit columns are always honoured; otherwise columns are profiled.
+    Integer columns are limited to numeric_rules unless column_rules names
+    them; the restriction is reported in skipped.
+
+    Returns:
+        (columns_to_scan, skipped, rules) where skipped maps column -> reason
+        and rules maps column -> rule IDs for restricted columns
+    """
+    column_rules = column_rules or {}
+    if columns is not None:
+        selected = [col for col in columns if col in df.columns]
+        return selected, {}, {col: column_rules[col] for col in selected if col in column_rules}
+
+    profile = profile_columns(df, sample_size, numeric_rules)
+    selected = [col for col, info in profile.items() if info["scan"]]
+    skipped = {col: info["reason"] for col, info in profile.items() if not info["scan"]}
+    rules = {}
+    for col in selected:
+        if col in column_rules:
+            rules[col] = column_rules[col]
+        elif "rules" in profile[col]:
+            rules[col] = profile[col]["rules"]
+            skipped[col] = profile[col]["reason"]
+    return selected, skipped, rules
+
+def build_output_frame(df, shielded: Dict[str, List], mode: str = "append",
+                       drop_unchanged: bool = True):
+    """
+    Lay out shielded columns according to the output mode
+
+    Args:
+        df: Original frame (modified in place for append/inplace)
+        shielded: {column: shielded values}
+        mode: "append", "inplace" or "changed"
+        drop_unchanged: In "changed" mode, omit columns where nothing changed
+    """
+    if mode == "inplace":
+        for col, values in shielded.items():
+            df[col] = values
+        return df
+
+    if mode == "changed":
+        import pandas as pd
+
+        out = pd.DataFrame({"row": df.index})
+        for col, values in shielded.items():
+            if drop_unchanged and all(
+                new == old or (new != new and old != old)
+                for new, old in zip(values, df[col])
+            ):
+                continue
+            out[col] = list(values)
+        return out
+
+    for col, values in shielded.items():
+        df[f"shielded_{col}"] = values
+    return df
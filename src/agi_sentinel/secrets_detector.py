@@ -0,0 +1,220 @@
+"""
+AGI Sentinel Secret Detector - Token-level, entropy-based secret detection
+Replaces the generic catch-all branches of SECRETS_API_KEY. Text is
+tokenized once; each token gets character-class and Shannon-entropy
+statistics in a single pass (entropy, character classes and how often
+neighbouring characters switch between letter and digit - words, camelCase
+identifiers and paths switch rarely, random keys constantly), and only
+plausible candidates are handed to the provider-specific patterns (sk-, AKIA,
+ghp_, xox, SG., AIza) or reported as generic high-entropy secrets.
+
+The entropy bar follows the token's alphabet - hex (at most 4 bits/char) and
+single-case alphanumerics (base32/36) cannot reach what mixed-case base62/64
+does. A token must clear its bar and either switch between letters and
+digits often enough or clear the bar by entropy_margin; the margin lets
+digit-poor random keys through while long identifiers stay below it.
+Canonical UUIDs are not secrets.
+
+Fixed-width base64 lines (MIME, PEM bodies) are judged as one blob: when the
+consecutive lines together exceed max_length none of them is reported.
+
+The detector exposes finditer() with match-like results, so it plugs into a
+compiled rule exactly where a regex would.
+"""
+
+import math
+import re
+import string
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Characters that can appear inside an API key / token
+_TOKEN_CHARS = r"A-Za-z0-9_\-+/."
+DEFAULT_MIN_TOKEN_LENGTH = 13   # shortest provider key: "sk-" + 10
+DEFAULT_MIN_LENGTH = 32         # generic secrets
+DEFAULT_MAX_LENGTH = 200        # longer runs are blobs (base64 images, dumps)
+DEFAULT_MIN_ENTROPY = 4.0       # bits per character, mixed-case tokens
+DEFAULT_MIN_CLASSES = 2         # of lower / upper / digit / symbol
+DEFAULT_MIN_SWITCH_RATIO = 0.1  # letter<->digit changes per character (identifiers ~0-0.05)
+DEFAULT_ENTROPY_MARGIN = 0.4    # above the bar by this much, the switch ratio is not needed
+# Entropy bar offsets for smaller alphabets (random 32-char hex ~3.6, base36 ~4.3)
+HEX_ENTROPY_OFFSET = 1.0
+SINGLE_CASE_ENTROPY_OFFSET = 0.5
+
+_HEX_CHARS = frozenset("0123456789abcdefABCDEF")
+_ALNUM_PAD = frozenset(string.ascii_letters + string.digits + "=")
+_UUID_RE = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+# Base64 lines shorter than this are not treated as part of a wrapped blob
+MIN_BLOB_LINE_LENGTH = 60
+
+# Two or more consecutive lines made only of base64 characters
+_BLOB_RE = re.compile(r"^(?:[A-Za-z0-9+/]{%d,}\r?\n)+[A-Za-z0-9+/]+={0,2}\r?$" % MIN_BLOB_LINE_LENGTH,
+                      re.MULTILINE)
+
+class TokenMatch:
+    """Minimal stand-in for re.Match returned by SecretDetector.finditer()"""
+    __slots__ = ("_text", "_start", "_end")
+
+    def __init__(self, text: str, start: int, end: int):
+        self._text = text
+        self._start = start
+        self._end = end
+
+    def group(self, index: int = 0) -> str:
+        if index != 0:
+            raise IndexError("no such group")
+        return self._text[self._start:self._end]
+
+    def start(self) -> int:
+        return self._start
+
+    def end(self) -> int:
+        return self._end
+
+    def span(self):
+        return self._start, self._end
+
+def token_stats(token: str) -> Dict:
+    """Character classes, letter/digit switches and Shannon entropy of a token in one pass"""
+    counts: Dict[str, int] = {}
+    seen = [False, False, False, False]   # lower, upper, digit, symbol
+    switches = alnum = 0
+    previous_digit = None
+    for ch in token:
+        counts[ch] = counts.get(ch, 0) + 1
+        if "a" <= ch <= "z":
+            cls = 0
+        elif "A" <= ch <= "Z":
+            cls = 1
+        elif "0" <= ch <= "9":
+            cls = 2
+        else:
+            cls = 3
+        seen[cls] = True
+        # Only letter<->digit changes count (case changes are camelCase);
+        # separators (/ . _ - + =) neither count nor break a run
+        if cls != 3:
+            is_digit = cls == 2
+            if previous_digit is not None and is_digit != previous_digit:
+                switches += 1
+            previous_digit = is_digit
+            alnum += 1
+
+    length = len(token)
+    entropy = 0.0
+    for count in counts.values():
+        p = count / length
+        entropy -= p * math.log2(p)
+
+    # Symbols (other than base32 padding) keep the full bar: separators are
+    # what identifiers, paths and snake_case names are made of.
+    if (seen[0] and seen[1]) or (seen[3] and set(counts) - _ALNUM_PAD):
+        alphabet = "mixed"
+    elif seen[2] and _HEX_CHARS.issuperset(counts):
+        alphabet = "hex"
+    else:
+        alphabet = "single_case"
+
+    return {
+        "length": length,
+        "entropy": entropy,
+        "classes": sum(seen),
+        "switch_ratio": switches / max(1, alnum - 1),
+        "alphabet": alphabet,
+    }
+
+class SecretDetector:
+    """Tokenize once, filter by entropy, then confirm with provider patterns"""
+
+    def __init__(
+        self,
+        provider_pattern: Optional[str] = None,
+        flags: int = re.IGNORECASE,
+        min_length: int = DEFAULT_MIN_LENGTH,
+        max_length: int = DEFAULT_MAX_LENGTH,
+        min_entropy: float = DEFAULT_MIN_ENTROPY,
+        min_classes: int = DEFAULT_MIN_CLASSES,
+        min_switch_ratio: float = DEFAULT_MIN_SWITCH_RATIO,
+        min_token_length: int = DEFAULT_MIN_TOKEN_LENGTH,
+        entropy_margin: float = DEFAULT_ENTROPY_MARGIN
+    ):
+        self.provider_regex = re.compile(provider_pattern, flags) if provider_pattern else None
+        self.min_length = min_length
+        self.max_length = max_length
+        self.min_entropy = min_entropy
+        self.min_classes = min_classes
+        self.min_switch_ratio = min_switch_ratio
+        self.entropy_margin = entropy_margin
+        self.entropy_bars = {
+            "mixed": min_entropy,
+            "single_case": min_entropy - SINGLE_CASE_ENTROPY_OFFSET,
+            "hex": min_entropy - HEX_ENTROPY_OFFSET,
+        }
+        # Lookbehind anchors tokens at their start so the engine never
+        # retries from every character inside a word
+        self.token_regex = re.compile(
+            rf"(?<![{_TOKEN_CHARS}])[{_TOKEN_CHARS}]{{{min_token_length},}}={{0,2}}"
+        )
+
+    @classmethod
+    def from_rule(cls, rule_config: Dict, flags: int = re.IGNORECASE) -> "SecretDetector":
+        return cls(
+            provider_pattern=rule_config.get("pattern"),
+            flags=flags,
+            min_length=rule_config.get("min_length", DEFAULT_MIN_LENGTH),
+            max_length=rule_config.get("max_length", DEFAULT_MAX_LENGTH),
+            min_entropy=rule_config.get("min_entropy", DEFAULT_MIN_ENTROPY),
+            min_classes=rule_config.get("min_classes", DEFAULT_MIN_CLASSES),
+            min_switch_ratio=rule_config.get("min_switch_ratio", DEFAULT_MIN_SWITCH_RATIO),
+            entropy_margin=rule_config.get("entropy_margin", DEFAULT_ENTROPY_MARGIN),
+        )
+
+    def _is_generic_secret(self, stats: Dict) -> bool:
+        if not self.min_length <= stats["length"] <= self.max_length:
+            return False
+        if stats["classes"] < self.min_classes:
+            return False
+        bar = self.entropy_bars[stats["alphabet"]]
+        if stats["entropy"] < bar:
+            return False
+        return (
+            stats["switch_ratio"] >= self.min_switch_ratio
+            or stats["entropy"] >= bar + self.entropy_margin
+        )
+
+    def _blob_ranges(self, text: str) -> List[Tuple[int, int]]:
+        """Spans of wrapped base64 blobs (equal-width lines) longer than max_length"""
+        ranges = []
+        for blob in _BLOB_RE.finditer(text):
+            lines = blob.group().split("\n")
+            widths = {len(line.rstrip("\r")) for line in lines[:-1]}
+            if len(widths) == 1 and len(lines[-1].rstrip("\r")) <= widths.pop() \
+                    and blob.end() - blob.start() - (len(lines) - 1) > self.max_length:
+                ranges.append(blob.span())
+        return ranges
+
+    def finditer(self, text: str) -> Iterator[TokenMatch]:
+        blobs = None
+        for token_match in self.token_regex.finditer(text):
+            start, end = token_match.span()
+
+            # Provider keys have a fixed shape - confirm them directly
+            found = False
+            if self.provider_regex is not None:
+                for provider_match in self.provider_regex.finditer(text, start, end):
+                    found = True
+                    yield TokenMatch(text, *provider_match.span())
+            if found:
+                continue
+
+            # Everything else must look random to count as a secret
+            token = text[start:end].strip(".-")
+            if len(token) < self.min_length or len(token) > self.max_length:
+                continue
+            if self._is_generic_secret(token_stats(token)) and not _UUID_RE.fullmatch(token):
+                # Only multi-line text can hold a wrapped blob; found lazily
+                if blobs is None:
+                    blobs = self._blob_ranges(text) if "\n" in text else []
+                if any(blob_start <= start < blob_end for blob_start, blob_end in blobs):
+                    continue
+                offset = text.index(token, start)
+                yield TokenMatch(text, offset, offset + len(token))
@@ -0,0 +1,364 @@
+"""
+AGI Sentinel Tree Scanner - Incremental directory scanning
+Walks a directory tree, shields every supported file and keeps a persistent
+index so unchanged files are skipped on the next run.
+
+Text and log files are shielded with scan_text by default. Memory-mapped
+bytes mode is opt-in (bytes_mode_min_size) and only used for files above that
+size, because it does not run non-ASCII rules, generic entropy secrets or
+Unicode normalization; the rules it skipped are reported in the summary.
+"""
+
+import csv
+import json
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .core import AGISentinelCore
+
+INDEX_FILENAME = ".sentinel_index.json"
+INDEX_FORMAT_VERSION = 1
+
+# ==================== FILE READERS ====================
+def shield_text_file(sentinel: AGISentinelCore, src: Path, dst: Path) -> int:
+    """Shield a plain text / log file line by line"""
+    incidents = 0
+    with open(src, "r", encoding="utf-8", errors="replace", newline="") as fin, \
+            open(dst, "w", encoding="utf-8", newline="") as fout:
+        for line in fin:
+            body = line.rstrip("\r\n")
+            ending = line[len(body):]
+            if body:
+                result = sentinel.scan_text(body)
+                body = result.processed_text
+                incidents += len(result.incidents)
+            fout.write(body + ending)
+    return incidents
+
+def shield_bytes_file(sentinel: AGISentinelCore, src: Path, dst: Path) -> Dict:
+    """Shield a large text / log file in memory-mapped bytes mode"""
+    result = sentinel.scan_large_file(str(src), output_path=str(dst))
+    if result["status"] != "COMPLETED":
+        raise RuntimeError(result.get("error", "bytes-mode scan failed"))
+    return result
+
+def shield_csv_file(sentinel: AGISentinelCore, src: Path, dst: Path) -> int:
+    """Shield every cell of a CSV file, streaming row by row"""
+    incidents = 0
+    with open(src, "r", encoding="utf-8", errors="replace", newline="") as fin, \
+            open(dst, "w", encoding="utf-8", newline="") as fout:
+        reader = csv.reader(fin)
+        writer = csv.writer(fout)
+        header = next(reader, None)
+        if header is not None:
+            writer.writerow(header)
+        for row in reader:
+            shielded_row = []
+            for cell in row:
+                if cell:
+                    result = sentinel.scan_text(cell)
+                    cell = result.processed_text
+                    incidents += len(result.incidents)
+                shielded_row.append(cell)
+            writer.writerow(shielded_row)
+    return incidents
+
+def shield_jsonl_file(sentinel: AGISentinelCore, src: Path, dst: Path) -> int:
+    """Shield string values of every record in a JSON Lines file"""
+    incidents = 0
+    with open(src, "r", encoding="utf-8", errors="replace") as fin, \
+            open(dst, "w", encoding="utf-8") as fout:
+        for line in fin:
+            if not line.strip():
+                fout.write(line)
+                continue
+            record, count = sentinel.scan_value(json.loads(line))
+            incidents += count
+            fout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return incidents
+
+def shield_json_file(sentinel: AGISentinelCore, src: Path, dst: Path) -> int:
+    """Shield string values of a JSON document"""
+    with open(src, "r", encoding="utf-8", errors="replace") as fin:
+        document = json.load(fin)
+    document, incidents = sentinel.scan_value(document)
+    with open(dst, "w", encoding="utf-8") as fout:
+        json.dump(document, fout, indent=2, ensure_ascii=False)
+    return incidents
+
+# Reader selection by file extension
+READERS: Dict[str, Callable[[AGISentinelCore, Path, Path], int]] = {
+    ".csv": shield_csv_file,
+    ".jsonl": shield_jsonl_file,
+    ".ndjson": shield_jsonl_file,
+    ".json": shield_json_file,
+    ".txt": shield_text_file,
+    ".log": shield_text_file,
+    ".md": shield_text_file,
+}
+
+# Extensions that may switch to bytes mode above bytes_mode_min_size
+BYTES_MODE_SUFFIXES = (".log", ".txt")
+
+# ==================== PERSISTENT INDEX ====================
+def hash_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of file contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class FileIndex:
+    """Persistent index of (path, size, mtime, content hash, rule-set version)"""
+
+    def __init__(self, index_path: str):
+        self.index_path = Path(index_path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != INDEX_FORMAT_VERSION:
+                return {}
+            return data.get("files", {})
+        except (OSError, ValueError) as e:
+            print(f"[!] Ignoring unreadable index {self.index_path}: {e}")
+            return {}
+
+    def save(self):
+        """Write the index atomically"""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with self._lock:
+            data = {"format": INDEX_FORMAT_VERSION, "files": self.entries}
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.index_path)
+
+    def check(self, path: Path, rules_version: str) -> Tuple[bool, str, os.stat_result]:
+        """
+        Decide whether a file can be skipped
+
+        The stat and content hash are taken before the file is scanned and
+        are what update() records, so a file that grows while it is being
+        shielded no longer matches its entry on the next run.
+
+        Returns:
+            (unchanged, content_hash, stat)
+        """
+        stat = path.stat()
+        with self._lock:
+            entry = self.entries.get(str(path))
+        if entry is None or entry.get("rules_version") != rules_version \
+                or entry.get("size") != stat.st_size:
+            return False, hash_file(path), stat
+        if entry.get("mtime_ns") == stat.st_mtime_ns:
+            return True, entry.get("sha256"), stat
+
+        # Touched but possibly identical - fall back to the content hash
+        content_hash = hash_file(path)
+        if content_hash == entry.get("sha256"):
+            with self._lock:
+                entry["mtime_ns"] = stat.st_mtime_ns
+            return True, content_hash, stat
+        return False, content_hash, stat
+
+    def update(self, path: Path, rules_version: str, content_hash: str, stat: os.stat_result,
+               output: Path):
+        """Record a scanned file with the stat/hash taken before it was scanned"""
+        with self._lock:
+            self.entries[str(path)] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": content_hash,
+                "rules_version": rules_version,
+                "output": str(output),
+                "scanned_at": datetime.now().isoformat()
+            }
+
+    def prune(self, root: Path, present: Set[str], output_dir: Path) -> List[str]:
+        """
+        Drop entries for files under root that no longer exist there, and
+        delete their shielded copies (only ever inside output_dir)
+
+        Returns:
+            The source paths that were pruned
+        """
+        prefix = str(root) + os.sep
+        with self._lock:
+            stale = [
+                path for path in self.entries
+                if path.startswith(prefix) and path not in present
+            ]
+            removed = [self.entries.pop(path) for path in stale]
+
+        for entry in removed:
+            output = Path(entry.get("output", ""))
+            if output.is_file() and output_dir in output.resolve().parents:
+                output.unlink()
+        return stale
+
+# ==================== TREE SCANNER ====================
+class TreeScanner:
+    """Recursive, parallel, incremental scanner for directory trees"""
+
+    def __init__(
+        self,
+        sentinel: AGISentinelCore,
+        index_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        readers: Optional[Dict[str, Callable]] = None,
+        bytes_mode_min_size: Optional[int] = None
+    ):
+        """
+        Args:
+            sentinel: Core used for scanning
+            index_path: Persistent index (default: <output_dir>/.sentinel_index.json)
+            max_workers: Files shielded in parallel
+            readers: Reader per file extension (default: READERS)
+            bytes_mode_min_size: Opt-in - .log/.txt files of at least this many
+                bytes are shielded in bytes mode (None: never)
+        """
+        self.sentinel = sentinel
+        self.index_path = index_path
+        self.max_workers = max_workers or sentinel.max_workers
+        self.readers = readers or READERS
+        self.bytes_mode_min_size = bytes_mode_min_size
+
+    def _use_bytes_mode(self, path: Path) -> bool:
+        return (
+            self.bytes_mode_min_size is not None
+            and path.suffix.lower() in BYTES_MODE_SUFFIXES
+            and path.stat().st_size >= self.bytes_mode_min_size
+        )
+
+    def _iter_files(self, root: Path, output_dir: Path):
+        for dirpath, dirnames, filenames in os.walk(root):
+            current = Path(dirpath).resolve()
+            # Never descend into our own output directory
+            dirnames[:] = sorted(
+                d for d in dirnames
+                if (current / d).resolve() != output_dir and not d.startswith(".")
+            )
+            for name in sorted(filenames):
+                path = current / name
+                if path.suffix.lower() in self.readers:
+                    yield path
+
+    def _process(self, index: FileIndex, root: Path, output_dir: Path, path: Path) -> Dict:
+        bytes_mode = self._use_bytes_mode(path)
+        rules_version = self.sentinel.rules_version
+        # Bytes-mode output differs from scan_text output - index it separately
+        if bytes_mode:
+            rules_version += "+bytes"
+        output = output_dir / path.relative_to(root)
+
+        unchanged, content_hash, stat = index.check(path, rules_version)
+        if unchanged and output.exists():
+            return {"path": str(path), "status": "SKIPPED", "incidents": 0}
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        rules_skipped: List[str] = []
+        rules_partial: List[str] = []
+        if bytes_mode:
+            result = shield_bytes_file(self.sentinel, path, output)
+            incidents = result["total_incidents"]
+            rules_skipped = result["rules_skipped"]
+            rules_partial = result["rules_partial"]
+        else:
+            reader = self.readers[path.suffix.lower()]
+            incidents = reader(self.sentinel, path, output)
+        index.update(path, rules_version, content_hash, stat, output)
+        return {
+            "path": str(path),
+            "status": "SCANNED",
+            "incidents": incidents,
+            "bytes_mode": bytes_mode,
+            "rules_skipped": rules_skipped,
+            "rules_partial": rules_partial
+        }
+
+    def scan_tree(self, root: str, output_dir: str = "shielded", prune: bool = True) -> Dict:
+        """
+        Shield every supported file under root into output_dir
+
+        Args:
+            root: Directory to scan
+            output_dir: Directory receiving shielded copies (mirrors root)
+            prune: Remove index entries and shielded copies of files that
+                were deleted from root since the last run
+
+        Returns:
+            Summary dictionary in the same shape as scan_file()
+        """
+        root_path = Path(root).resolve()
+        if not root_path.is_dir():
+            return {
+                "status": "ERROR",
+                "error": f"Directory not found: {root}",
+                "timestamp": datetime.now().isoformat()
+            }
+
+        output_path = Path(output_dir).resolve()
+        output_path.mkdir(parents=True, exist_ok=True)
+        index = FileIndex(self.index_path or output_path / INDEX_FILENAME)
+
+        scanned = skipped = total_incidents = bytes_mode_files = 0
+        rules_skipped = set()
+        rules_partial = set()
+        failures: List[Dict] = []
+        pruned: List[str] = []
+
+        try:
+            paths = list(self._iter_files(root_path, output_path))
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(self._process, index, root_path, output_path, path): path
+                    for path in paths
+                }
+                for future in as_completed(futures):
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        failures.append({"path": str(futures[future]), "error": str(e)})
+                        continue
+                    if outcome["status"] == "SKIPPED":
+                        skipped += 1
+                    else:
+                        scanned += 1
+                        total_incidents += outcome["incidents"]
+                        if outcome["bytes_mode"]:
+                            bytes_mode_files += 1
+                            rules_skipped.update(outcome["rules_skipped"])
+                            rules_partial.update(outcome["rules_partial"])
+            if prune:
+                pruned = index.prune(root_path, {str(path) for path in paths}, output_path)
+        finally:
+            index.save()
+
+        return {
+            "status": "COMPLETED" if not failures else "COMPLETED_WITH_ERRORS",
+            "input_dir": str(root_path),
+            "output_dir": str(output_path),
+            "files_scanned": scanned,
+            "files_skipped": skipped,
+            "files_failed": len(failures),
+            "failures": failures,
+            "files_pruned": pruned,
+            "files_bytes_mode": bytes_mode_files,
+            "rules_skipped": sorted(rules_skipped),
+            "rules_partial": sorted(rules_partial),
+            "total_incidents": total_incidents,
+            "rules_version": self.sentinel.rules_version,
+            "timestamp": datetime.now().isoformat()
+        }
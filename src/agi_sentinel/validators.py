@@ -0,0 +1,81 @@
+"""
+AGI Sentinel Validators - Checks run on regex candidates before incidents
+A rule lists validators by name ("validators": ["luhn"]); a candidate that
+fails any of them is dropped before an incident is created, redaction is
+applied or anything is logged.
+"""
+
+from typing import Callable, Dict, List
+
+Validator = Callable[[str], bool]
+
+def _digits(value: str) -> str:
+    return "".join(ch for ch in value if ch.isdigit())
+
+def luhn_check(value: str) -> bool:
+    """Luhn (mod 10) checksum used by payment card numbers"""
+    digits = _digits(value)
+    if len(digits) < 12:
+        return False
+    total = 0
+    for index, ch in enumerate(reversed(digits)):
+        digit = ord(ch) - 48
+        if index % 2 == 1:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return total % 10 == 0
+
+def iban_mod97(value: str) -> bool:
+    """ISO 13616 IBAN check: rearranged, letters expanded, mod 97 == 1"""
+    iban = "".join(value.split()).upper()
+    if len(iban) < 15 or len(iban) > 34 or not iban.isalnum():
+        return False
+    if not (iban[:2].isalpha() and iban[2:4].isdigit()):
+        return False
+    rearranged = iban[4:] + iban[:4]
+    remainder = 0
+    for ch in rearranged:
+        # Letters expand to two digits (A=10 ... Z=35)
+        chunk = str(ord(ch) - 55) if ch.isalpha() else ch
+        remainder = int(str(remainder) + chunk) % 97
+    return remainder == 1
+
+def ssn_area(value: str) -> bool:
+    """US SSN structure: no 000/666/9xx area, 00 group or 0000 serial"""
+    digits = _digits(value)
+    if len(digits) != 9:
+        return False
+    area, group, serial = digits[:3], digits[3:5], digits[5:]
+    if area in ("000", "666") or area[0] == "9":
+        return False
+    return group != "00" and serial != "0000"
+
+VALIDATORS: Dict[str, Validator] = {
+    "luhn": luhn_check,
+    "iban_mod97": iban_mod97,
+    "ssn": ssn_area,
+}
+
+def register_validator(name: str, func: Validator):
+    """Register a custom validator usable from rule configs"""
+    VALIDATORS[name] = func
+
+def resolve_validators(rule_id: str, rule_config: Dict) -> List[Validator]:
+    """Turn a rule's "validators" list (and legacy "luhn_check") into callables"""
+    names = rule_config.get("validators") or []
+    if isinstance(names, str):
+        names = [names]
+    names = list(names)
+    if rule_config.get("luhn_check") and "luhn" not in names:
+        names.append("luhn")
+
+    resolved = []
+    for name in names:
+        func = VALIDATORS.get(name)
+        if func is None:
+            print(f"[!] Unknown validator '{name}' in rule {rule_id} - ignored")
+            continue
+        resolved.append(func)
+    return resolved